@@ -1,12 +1,15 @@
 """Onboard - create first admin user when no users exist."""
-from fastapi import APIRouter, HTTPException, Depends, status
+
+from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
 from sqlalchemy import func
+from sqlalchemy.orm import Session
 
+from app.api.analytics import security_audit
+from app.api.health import healthz
+from app.auth.security import hash_password
 from app.persistence.database import get_db
 from app.persistence.models import User, UserRole
-from app.auth.security import hash_password
 
 router = APIRouter(prefix="/onboard", tags=["onboard"])
 
@@ -30,10 +33,9 @@ def onboard(payload: OnboardRequest, db: Session = Depends(get_db)):
     user_count = db.query(func.count(User.id)).scalar()
     if user_count > 0:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Onboard already completed. Users exist."
+            status_code=status.HTTP_403_FORBIDDEN, detail="Onboard already completed. Users exist."
         )
-    
+
     # Create first admin user
     admin = User(
         username=payload.username,
@@ -43,12 +45,12 @@ def onboard(payload: OnboardRequest, db: Session = Depends(get_db)):
     db.add(admin)
     db.commit()
     db.refresh(admin)
-    
+
     return OnboardResponse(
         message="First admin user created",
         username=payload.username,
         password=payload.password,
-        warning="Change password immediately after first login!"
+        warning="Change password immediately after first login!",
     )
 
 
@@ -56,7 +58,13 @@ def onboard(payload: OnboardRequest, db: Session = Depends(get_db)):
 def onboard_status(db: Session = Depends(get_db)):
     """Check if onboard is needed (no users exist)."""
     user_count = db.query(func.count(User.id)).scalar()
+    return {"onboard_required": user_count == 0, "user_count": user_count}
+
+
+@router.get("/doctor")
+def onboard_doctor():
+    """Health and security audit for `prime doctor` in one round trip (public data only)."""
     return {
-        "onboard_required": user_count == 0,
-        "user_count": user_count
+        "health": healthz(),
+        "security_audit": security_audit(),
     }
@@ -0,0 +1 @@
+"""Management commands run inside the backend container (``python -m app.cli.<name>``)."""
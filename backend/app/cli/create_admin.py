@@ -0,0 +1,39 @@
+"""Create (or promote) the dashboard admin user.
+
+Reads ``{"user": ..., "pass": ...}`` as JSON from stdin (keeping the password off
+argv and the environment) and prints one of ``CREATED``, ``UPDATED`` or ``EXISTS``
+for the onboarding script to parse.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+
+from app.auth.security import hash_password
+from app.persistence.database import SessionLocal
+from app.persistence.models import User, UserRole
+
+
+def create_admin(username: str, password: str) -> str:
+    with SessionLocal() as db:
+        existing = db.query(User).filter(User.username == username).first()
+        if existing:
+            if existing.password_hash:
+                return "EXISTS"
+            existing.password_hash = hash_password(password)
+            existing.role = UserRole.admin
+            db.commit()
+            return "UPDATED"
+        db.add(User(username=username, password_hash=hash_password(password), role=UserRole.admin))
+        db.commit()
+        return "CREATED"
+
+
+def main() -> None:
+    creds = json.loads(sys.stdin.read())
+    print(create_admin(creds["user"], creds["pass"]))
+
+
+if __name__ == "__main__":
+    main()
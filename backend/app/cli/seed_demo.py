@@ -0,0 +1,66 @@
+"""Seed a default organization, demo provider and demo agent (dev only)."""
+
+from __future__ import annotations
+
+from app.persistence.database import SessionLocal
+from app.persistence.models import Agent, DMPolicy, Organization, Provider, ProviderType
+
+
+def seed_demo() -> None:
+    with SessionLocal() as db:
+        org = db.query(Organization).filter(Organization.slug == "default").first()
+        if not org:
+            org = Organization(name="Prime", slug="default", active=True)
+            db.add(org)
+            db.commit()
+            db.refresh(org)
+            print("Org created: default")
+        else:
+            print("Org exists: default")
+
+        provider = db.query(Provider).filter(Provider.name == "demo_anthropic").first()
+        if not provider:
+            provider = Provider(
+                name="demo_anthropic",
+                type=ProviderType.Anthropic,
+                config={
+                    "api_key": "",
+                    "default_model": "claude-sonnet-4-5-20250929",
+                    "models": {"claude-sonnet-4-5-20250929": {"max_tokens": 4096}},
+                },
+                active=True,
+                org_id=org.id,
+            )
+            db.add(provider)
+            db.commit()
+            db.refresh(provider)
+            print(f"Provider created: {provider.name}")
+        else:
+            print(f"Provider exists: {provider.name}")
+
+        agent = db.query(Agent).filter(Agent.name == "demo_agent").first()
+        if not agent:
+            agent = Agent(
+                name="demo_agent",
+                description="Demo agent with web search and memory",
+                default_provider_id=provider.id,
+                dm_policy=DMPolicy.open,
+                memory_enabled=True,
+                web_search_enabled=True,
+                code_execution_enabled=True,
+                system_prompt="You are a helpful assistant.",
+                active=True,
+                org_id=org.id,
+            )
+            db.add(agent)
+            db.commit()
+            db.refresh(agent)
+            print(f"Agent created: {agent.name}")
+        else:
+            print(f"Agent exists: {agent.name}")
+
+    print("Seed complete.")
+
+
+if __name__ == "__main__":
+    seed_demo()
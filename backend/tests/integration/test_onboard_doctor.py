@@ -0,0 +1,18 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_onboard_doctor_returns_health_and_audit():
+    response = TestClient(app).get("/api/onboard/doctor")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["health"]["status"] in ("ok", "degraded")
+    assert isinstance(data["security_audit"], dict)
+
+
+def test_onboard_doctor_exposes_no_db_counts():
+    data = TestClient(app).get("/api/onboard/doctor").json()
+
+    assert set(data) == {"health", "security_audit"}
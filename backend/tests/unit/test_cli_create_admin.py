@@ -0,0 +1,37 @@
+"""Tests for the create_admin management command."""
+
+from contextlib import nullcontext
+
+import pytest
+
+from app.auth.security import verify_password
+from app.cli import create_admin as cli
+from app.persistence.models import User, UserRole
+
+
+@pytest.fixture()
+def patched_session(db_session, monkeypatch):
+    monkeypatch.setattr(cli, "SessionLocal", lambda: nullcontext(db_session))
+    return db_session
+
+
+def test_creates_admin(patched_session):
+    assert cli.create_admin("root", "s3cret") == "CREATED"
+    user = patched_session.query(User).filter(User.username == "root").one()
+    assert user.role == UserRole.admin
+    assert verify_password("s3cret", user.password_hash)
+
+
+def test_existing_user_with_password_is_left_alone(patched_session, test_user):
+    original_hash = test_user.password_hash
+    assert cli.create_admin(test_user.username, "other") == "EXISTS"
+    assert test_user.password_hash == original_hash
+
+
+def test_existing_user_without_password_is_promoted(patched_session):
+    user = User(username="nopass", password_hash=None, role=UserRole.user)
+    patched_session.add(user)
+    patched_session.commit()
+    assert cli.create_admin("nopass", "pw") == "UPDATED"
+    assert user.role == UserRole.admin
+    assert verify_password("pw", user.password_hash)
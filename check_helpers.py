@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Общие помощники для проверочных скриптов Prime
+(test_prime_system.py, test_api_demo.py, comprehensive_test.py)
+"""
+
+import contextlib
+import io
+import os
+
+def iter_files(root, skip_dirs=()):
+    """Все файлы под root (DirEntry) за один обход os.scandir; каталоги из skip_dirs не посещаются"""
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in skip_dirs:
+                        stack.append(entry.path)
+                else:
+                    yield entry
+
+def count_files(root):
+    """Подсчет файлов под root за один обход: (всего, из них .py)"""
+    total = py = 0
+    for entry in iter_files(root):
+        total += 1
+        if entry.name.endswith(".py"):
+            py += 1
+    return total, py
+
+def run_captured(test_name, test_func):
+    """Запуск проверки с буферизацией ее вывода: (успех, текст)"""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        print(f"\n{test_name}:")
+        try:
+            success = test_func()
+        except Exception as e:
+            print(f"  ✗ Ошибка: {e}")
+            success = False
+    return success, buf.getvalue()
@@ -8,7 +8,8 @@ import sys
 import os
 import subprocess
 import json
-from pathlib import Path
+
+from check_helpers import count_files
 
 def run_command(cmd, cwd=None):
     """Выполнить команду и вернуть результат"""
@@ -111,9 +112,9 @@ def test_frontend():
     # 4. Проверка dist директории
     print("\n4. Проверка собранных файлов...")
     if os.path.exists("app/dist"):
-        dist_files = list(Path("app/dist").rglob("*"))
+        dist_files, _ = count_files("app/dist")
         if dist_files:
-            print(f"   ✓ Собрано {len(dist_files)} файлов")
+            print(f"   ✓ Собрано {dist_files} файлов")
             tests.append(("Собранные файлы", True))
         else:
             print("   ✗ Директория dist пуста")
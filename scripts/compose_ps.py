@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""`docker compose ps --format json` reader shared by gateway_cli.py and onboard.py."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers keep catching the stdlib type.
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def stream_compose_ps(cmd: list[str], *, cwd: Path | None = None) -> tuple[list[dict[str, Any]] | None, str]:
+    """Run a `docker compose ... ps --format json` command, parsing NDJSON rows as docker emits them.
+
+    Returns (services, "") on success or (None, error) when docker exits non-zero.
+    """
+    # Imported here so importers that never list containers don't pay for them.
+    import subprocess
+    import tempfile
+
+    rows: list[dict[str, Any]] = []
+    pending: list[str] = []
+    # stderr goes to a temp file so a chatty docker can never block on a full pipe
+    # while we are still draining stdout.
+    with tempfile.TemporaryFile() as err:
+        with subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=err, text=True, cwd=str(cwd) if cwd else None
+        ) as proc:
+            assert proc.stdout is not None
+            for line in proc.stdout:
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                if not pending and stripped.startswith("{"):
+                    try:
+                        item = _loads(stripped)
+                    except json.JSONDecodeError:
+                        pending.append(line)
+                        continue
+                    if isinstance(item, dict):
+                        rows.append(item)
+                    continue
+                # Array or pretty-printed output (older docker CLIs): parse as a whole below.
+                pending.append(line)
+        if proc.returncode != 0:
+            err.seek(0)
+            message = err.read().decode("utf-8", errors="replace").strip()
+            return None, message or "docker compose ps failed"
+
+    if pending:
+        rows.extend(parse_compose_ps("".join(pending)))
+    return rows, ""
+
+
+def parse_compose_ps(raw: str) -> list[dict[str, Any]]:
+    text = (raw or "").strip()
+    if not text:
+        return []
+    # Newer docker CLIs emit NDJSON (one object per line); only attempt a whole-document
+    # parse when the output looks like a single array/object to avoid a guaranteed failure.
+    if text.startswith("[") or (text.startswith("{") and "\n{" not in text):
+        try:
+            parsed = _loads(text)
+            if isinstance(parsed, list):
+                return [item for item in parsed if isinstance(item, dict)]
+            if isinstance(parsed, dict):
+                return [parsed]
+        except json.JSONDecodeError:
+            pass
+
+    rows: list[dict[str, Any]] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = _loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(item, dict):
+            rows.append(item)
+    return rows
@@ -2,15 +2,29 @@
 from __future__ import annotations
 
 import argparse
+import atexit
+import functools
 import json
 import os
-import subprocess
 import sys
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from shutil import which as _which_impl
+from typing import TYPE_CHECKING, Any
 
-from ws_rpc import WSRPCClient, WebSocketError, normalize_ws_url
+from compose_ps import stream_compose_ps
+
+if TYPE_CHECKING:
+    from ws_rpc import WSRPCClient
+
+# ws_rpc (socket/ssl) and subprocess are imported lazily by the subcommands that need them,
+# so `--help`, `discover`, `probe` and the lifecycle stubs start without paying for them.
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
 
 ROOT = Path(__file__).resolve().parents[1]
 COMPOSE_FILE = ROOT / "docker-compose.yml"
@@ -18,47 +32,73 @@ COMPOSE_FILE = ROOT / "docker-compose.yml"
 AUTH_DIR = Path(os.getenv("XDG_CONFIG_HOME", Path.home() / ".config")) / "prime"
 AUTH_FILE = AUTH_DIR / "auth.json"
 
-R = "\033[0m"
-GRN = "\033[92m"
-YLW = "\033[93m"
-RED = "\033[91m"
-CYN = "\033[96m"
-DIM = "\033[2m"
-BLD = "\033[1m"
 
+@dataclass(frozen=True)
+class _Colors:
+    R: str = ""
+    GRN: str = ""
+    YLW: str = ""
+    RED: str = ""
+    CYN: str = ""
+    DIM: str = ""
+    BLD: str = ""
+
+
+_COLORS_ON = _Colors(
+    R="\033[0m",
+    GRN="\033[92m",
+    YLW="\033[93m",
+    RED="\033[91m",
+    CYN="\033[96m",
+    DIM="\033[2m",
+    BLD="\033[1m",
+)
+_COLORS_OFF = _Colors()
+
+if orjson is not None:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers keep catching the stdlib type.
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+
+else:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=True, indent=2)
+
+
+def _pick_colors(*, no_color: bool) -> _Colors:
+    if no_color or os.getenv("NO_COLOR") or not sys.stdout.isatty():
+        return _COLORS_OFF
+    return _COLORS_ON
 
-def disable_color() -> None:
-    global R, GRN, YLW, RED, CYN, DIM, BLD
-    R = ""
-    GRN = ""
-    YLW = ""
-    RED = ""
-    CYN = ""
-    DIM = ""
-    BLD = ""
+
+C = _COLORS_ON
 
 
 def ok(msg: str) -> None:
-    print(f"{GRN}✓{R} {msg}")
+    print(f"{C.GRN}✓{C.R} {msg}")
 
 
 def warn(msg: str) -> None:
-    print(f"{YLW}!{R} {msg}")
+    print(f"{C.YLW}!{C.R} {msg}")
 
 
 def fail(msg: str) -> None:
-    print(f"{RED}✗{R} {msg}")
+    print(f"{C.RED}✗{C.R} {msg}")
 
 
 def info(msg: str) -> None:
-    print(f"{CYN}→{R} {msg}")
+    print(f"{C.CYN}→{C.R} {msg}")
 
 
 def _load_auth() -> dict[str, Any] | None:
     if not AUTH_FILE.exists():
         return None
     try:
-        data = json.loads(AUTH_FILE.read_text(encoding="utf-8"))
+        data = _loads(AUTH_FILE.read_bytes())
         return data if isinstance(data, dict) else None
     except Exception:
         return None
@@ -66,6 +106,8 @@ def _load_auth() -> dict[str, Any] | None:
 
 def _resolve_gateway_url(args: argparse.Namespace) -> tuple[str, bool]:
     """Return (ws_url, url_was_explicitly_set)."""
+    from ws_rpc import normalize_ws_url
+
     url = getattr(args, "url", None)
     if url:
         return normalize_ws_url(url), True
@@ -101,11 +143,11 @@ def _resolve_credentials(args: argparse.Namespace, *, url_explicit: bool) -> tup
 
 
 def _json_print(obj: Any) -> None:
-    print(json.dumps(obj, ensure_ascii=True, indent=2))
+    print(_dumps(obj))
 
 
-def _dc(*args: str, capture: bool = False) -> subprocess.CompletedProcess:
-    cmd = [
+def _dc_cmd(*args: str) -> list[str]:
+    return [
         "docker",
         "compose",
         "--project-directory",
@@ -114,38 +156,6 @@ def _dc(*args: str, capture: bool = False) -> subprocess.CompletedProcess:
         str(COMPOSE_FILE),
         *args,
     ]
-    kwargs: dict[str, Any] = {"check": False}
-    if capture:
-        kwargs["capture_output"] = True
-        kwargs["text"] = True
-    return subprocess.run(cmd, **kwargs)
-
-
-def _parse_compose_ps(raw: str) -> list[dict[str, Any]]:
-    text = (raw or "").strip()
-    if not text:
-        return []
-    try:
-        parsed = json.loads(text)
-        if isinstance(parsed, list):
-            return [item for item in parsed if isinstance(item, dict)]
-        if isinstance(parsed, dict):
-            return [parsed]
-    except json.JSONDecodeError:
-        pass
-
-    rows: list[dict[str, Any]] = []
-    for line in text.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            item = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(item, dict):
-            rows.append(item)
-    return rows
 
 
 def _systemd_unit_snapshot(*, deep: bool) -> dict[str, Any]:
@@ -155,39 +165,62 @@ def _systemd_unit_snapshot(*, deep: bool) -> dict[str, Any]:
     if not result["systemctl"]:
         return result
 
-    def run(args: list[str]) -> tuple[int, str]:
-        r = subprocess.run(args, capture_output=True, text=True, check=False)
-        out = (r.stdout or r.stderr or "").strip()
-        return r.returncode, out
+    import subprocess
+
+    def show(*scope: str) -> tuple[str, str]:
+        # One `systemctl show` per scope instead of separate is-active/is-enabled forks.
+        # Output is plain ASCII key=value pairs: skip text-mode decoding and stderr capture.
+        r = subprocess.run(
+            ["systemctl", *scope, "show", unit, "--property=ActiveState,UnitFileState"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        props: dict[str, str] = {}
+        if r.returncode == 0:
+            for line in (r.stdout or b"").decode("ascii", "replace").splitlines():
+                key, sep, value = line.partition("=")
+                if sep:
+                    props[key.strip()] = value.strip()
+        return props.get("ActiveState") or "unknown", props.get("UnitFileState") or "unknown"
 
-    code, out = run(["systemctl", "--user", "is-active", unit])
-    result["user_active"] = out or ("active" if code == 0 else "unknown")
-    code, out = run(["systemctl", "--user", "is-enabled", unit])
-    result["user_enabled"] = out or ("enabled" if code == 0 else "unknown")
+    result["user_active"], result["user_enabled"] = show("--user")
 
     if deep:
-        code, out = run(["systemctl", "is-active", unit])
-        result["system_active"] = out or ("active" if code == 0 else "unknown")
-        code, out = run(["systemctl", "is-enabled", unit])
-        result["system_enabled"] = out or ("enabled" if code == 0 else "unknown")
+        result["system_active"], result["system_enabled"] = show()
 
     return result
 
 
+@functools.lru_cache(maxsize=32)
 def _which(cmd: str) -> str | None:
-    from shutil import which
+    return _which_impl(cmd)
 
-    return which(cmd)
 
+_CLIENTS: dict[tuple[str, str | None, str | None, int], WSRPCClient] = {}
+
+
+def _shutdown_clients() -> None:
+    while _CLIENTS:
+        _, client = _CLIENTS.popitem()
+        try:
+            client.shutdown()
+        except Exception:
+            pass
+
+
+atexit.register(_shutdown_clients)
+
+
+def _get_client(url: str, token: str | None, password: str | None, timeout_ms: int) -> WSRPCClient:
+    """Return a connected client, reusing the WS handshake across calls in one CLI run."""
+    key = (url, token, password, int(timeout_ms))
+    client = _CLIENTS.get(key)
+    if client is not None:
+        return client
+
+    from ws_rpc import WSRPCClient
 
-def _rpc_probe(
-    *,
-    url: str,
-    token: str | None,
-    password: str | None,
-    timeout_ms: int,
-) -> tuple[bool, dict[str, Any] | str]:
-    t0 = time.monotonic()
     client = WSRPCClient(
         url=url,
         token=token,
@@ -197,13 +230,46 @@ def _rpc_probe(
     )
     try:
         client.connect()
-        payload = client.request("status", {})
-        dt_ms = int((time.monotonic() - t0) * 1000)
+    except Exception:
+        client.shutdown()
+        raise
+    _CLIENTS[key] = client
+    return client
+
+
+def _client_request(
+    url: str,
+    token: str | None,
+    password: str | None,
+    timeout_ms: int,
+    method: str,
+    params: dict[str, Any],
+    **kwargs: Any,
+) -> dict[str, Any]:
+    client = _get_client(url, token, password, timeout_ms)
+    try:
+        return client.request(method, params, **kwargs)
+    except Exception:
+        # The socket state is unknown after a failed request; don't hand it out again.
+        _CLIENTS.pop((url, token, password, int(timeout_ms)), None)
+        client.shutdown()
+        raise
+
+
+def _rpc_probe(
+    *,
+    url: str,
+    token: str | None,
+    password: str | None,
+    timeout_ms: int,
+) -> tuple[bool, dict[str, Any] | str]:
+    t0 = time.monotonic_ns()
+    try:
+        payload = _client_request(url, token, password, timeout_ms, "status", {})
+        dt_ms = (time.monotonic_ns() - t0) // 1_000_000
         return True, {"latency_ms": dt_ms, "payload": payload}
     except Exception as exc:
         return False, str(exc)
-    finally:
-        client.shutdown()
 
 
 def cmd_health(args: argparse.Namespace) -> int:
@@ -212,25 +278,14 @@ def cmd_health(args: argparse.Namespace) -> int:
     ws_url, url_explicit = _resolve_gateway_url(args)
     token, password = _resolve_credentials(args, url_explicit=url_explicit)
 
-    client = WSRPCClient(
-        url=ws_url,
-        token=token,
-        password=password,
-        timeout_ms=args.timeout,
-        platform=sys.platform,
-    )
-    try:
-        client.connect()
-        payload = client.request("health.get", {})
-    finally:
-        client.shutdown()
+    payload = _client_request(ws_url, token, password, args.timeout, "health.get", {})
 
     if getattr(args, "json", False):
         _json_print(payload)
         return 0
 
-    print(f"{BLD}Prime Gateway Health{R}")
-    print(f"{DIM}{'-' * 54}{R}")
+    print(f"{C.BLD}Prime Gateway Health{C.R}")
+    print(f"{C.DIM}{'-' * 54}{C.R}")
     ok(f"WS: {ws_url}")
     ok(f"health.get: {payload.get('status', 'ok')}")
     return 0
@@ -245,7 +300,7 @@ def cmd_call(args: argparse.Namespace) -> int:
     params: dict[str, Any] = {}
     if args.params:
         try:
-            parsed = json.loads(args.params)
+            parsed = _loads(args.params)
         except json.JSONDecodeError as exc:
             print(f"Invalid JSON for --params: {exc}", file=sys.stderr)
             return 2
@@ -254,29 +309,26 @@ def cmd_call(args: argparse.Namespace) -> int:
         else:
             params = {"value": parsed}
 
-    client = WSRPCClient(
-        url=ws_url,
-        token=token,
-        password=password,
-        timeout_ms=args.timeout,
-        platform=sys.platform,
+    payload = _client_request(
+        ws_url,
+        token,
+        password,
+        args.timeout,
+        args.method,
+        params,
+        expect_final=bool(args.expect_final),
     )
-    try:
-        client.connect()
-        payload = client.request(args.method, params, expect_final=bool(args.expect_final))
-    finally:
-        client.shutdown()
 
     if getattr(args, "json", False):
         _json_print(payload)
         return 0
 
-    print(f"{BLD}Gateway Call{R}")
-    print(f"{DIM}{'-' * 54}{R}")
+    print(f"{C.BLD}Gateway Call{C.R}")
+    print(f"{C.DIM}{'-' * 54}{C.R}")
     print(f"method: {args.method}")
     print(f"url:    {ws_url}")
     print("")
-    print(json.dumps(payload, ensure_ascii=True, indent=2))
+    print(_dumps(payload))
     return 0
 
 
@@ -289,18 +341,24 @@ def cmd_status(args: argparse.Namespace) -> int:
         token, password = _resolve_credentials(args, url_explicit=url_explicit)
 
     docker_snapshot: dict[str, Any] = {"ok": False}
-    compose_ps = _dc("ps", "--format", "json", capture=True)
-    if compose_ps.returncode == 0:
+    services, error = stream_compose_ps(_dc_cmd("ps", "--format", "json"))
+    running = 0
+    if services is not None:
         docker_snapshot["ok"] = True
-        docker_snapshot["services"] = _parse_compose_ps(compose_ps.stdout or "")
+        docker_snapshot["services"] = services
+        running = sum(1 for svc in services if str(svc.get("State", "")).lower() == "running")
     else:
-        docker_snapshot["error"] = (compose_ps.stderr or "").strip() or "docker compose ps failed"
+        docker_snapshot["error"] = error
 
     systemd_snapshot = _systemd_unit_snapshot(deep=bool(args.deep))
+    systemd_active = "active" in (systemd_snapshot.get("user_active"), systemd_snapshot.get("system_active"))
 
     probe_ok = None
     probe_detail: dict[str, Any] | str | None = None
-    if not args.no_probe:
+    if not args.no_probe and docker_snapshot["ok"] and running == 0 and not systemd_active:
+        # Nothing can answer the handshake; don't sit out the full timeout budget.
+        probe_ok, probe_detail = False, "gateway service not running"
+    elif not args.no_probe:
         probe_ok, probe_detail = _rpc_probe(
             url=ws_url,
             token=token,
@@ -320,17 +378,11 @@ def cmd_status(args: argparse.Namespace) -> int:
         _json_print(payload)
         return 0 if (args.no_probe or probe_ok) else 1
 
-    print(f"{BLD}Prime Gateway Status{R}")
-    print(f"{DIM}{'-' * 54}{R}")
+    print(f"{C.BLD}Prime Gateway Status{C.R}")
+    print(f"{C.DIM}{'-' * 54}{C.R}")
 
     if docker_snapshot.get("ok"):
-        services = docker_snapshot.get("services") or []
-        running = 0
-        for svc in services:
-            state = str(svc.get("State", "")).lower()
-            if state == "running":
-                running += 1
-        ok(f"Docker services: {running}/{len(services)} running")
+        ok(f"Docker services: {running}/{len(services or [])} running")
     else:
         warn(f"Docker: {docker_snapshot.get('error', 'unavailable')}")
 
@@ -382,7 +434,26 @@ def cmd_unimplemented(args: argparse.Namespace) -> int:
     return 1
 
 
-def build_parser() -> argparse.ArgumentParser:
+_LIFECYCLE_SUBCOMMANDS = ("run", "install", "start", "stop", "restart", "uninstall")
+_SUBCOMMANDS = frozenset({"health", "status", "call", "discover", "probe", *_LIFECYCLE_SUBCOMMANDS})
+_VALUE_FLAGS = frozenset({"--url", "--token", "--password", "--timeout"})
+
+
+def _peek_subcommand(argv: list[str]) -> str | None:
+    """Return the subcommand named in argv (skipping shared flag values), if any."""
+    prev: str | None = None
+    for tok in argv:
+        if tok == "--":
+            return None
+        if not tok.startswith("-") and prev not in _VALUE_FLAGS:
+            return tok if tok in _SUBCOMMANDS else None
+        prev = tok
+    return None
+
+
+def build_parser(only: str | None = None) -> argparse.ArgumentParser:
+    """Build the CLI parser; with `only`, register just that subcommand (the common fast path)."""
+
     def add_shared(p: argparse.ArgumentParser) -> None:
         # OpenClaw examples put flags after the subcommand, so we add shared flags to both the
         # main parser and each subparser. Use SUPPRESS defaults to avoid overriding values that
@@ -399,38 +470,48 @@ def build_parser() -> argparse.ArgumentParser:
             help="Timeout budget in milliseconds (defaults vary by subcommand)",
         )
 
+    def wanted(name: str) -> bool:
+        return only is None or only == name
+
     parser = argparse.ArgumentParser(prog="prime gateway", description="Prime Gateway CLI (OpenClaw-compatible)")
     add_shared(parser)
 
     sub = parser.add_subparsers(dest="subcommand", required=False)
 
-    p_health = sub.add_parser("health", help="Gateway health check (WS RPC)")
-    add_shared(p_health)
-    p_health.set_defaults(func=cmd_health)
-
-    p_status = sub.add_parser("status", help="Gateway service status + optional WS probe")
-    add_shared(p_status)
-    p_status.add_argument("--no-probe", action="store_true", help="Skip WS probe")
-    p_status.add_argument("--deep", action="store_true", help="Scan system-level services too")
-    p_status.set_defaults(func=cmd_status)
-
-    p_call = sub.add_parser("call", help="Call a WS RPC method")
-    add_shared(p_call)
-    p_call.add_argument("method", help="RPC method (e.g. status, health.get, config.get)")
-    p_call.add_argument("--params", default="", help="JSON params object (default: {})")
-    p_call.add_argument("--expect-final", action="store_true", help="Wait for final response (when supported)")
-    p_call.set_defaults(func=cmd_call)
-
-    p_discover = sub.add_parser("discover", help="Discover gateways on LAN via mDNS/Bonjour")
-    add_shared(p_discover)
-    p_discover.set_defaults(func=cmd_discover)
-
-    p_probe = sub.add_parser("probe", help="Probe gateways (local, remote, SSH)")
-    add_shared(p_probe)
-    p_probe.set_defaults(func=cmd_probe)
+    if wanted("health"):
+        p_health = sub.add_parser("health", help="Gateway health check (WS RPC)")
+        add_shared(p_health)
+        p_health.set_defaults(func=cmd_health)
+
+    if wanted("status"):
+        p_status = sub.add_parser("status", help="Gateway service status + optional WS probe")
+        add_shared(p_status)
+        p_status.add_argument("--no-probe", action="store_true", help="Skip WS probe")
+        p_status.add_argument("--deep", action="store_true", help="Scan system-level services too")
+        p_status.set_defaults(func=cmd_status)
+
+    if wanted("call"):
+        p_call = sub.add_parser("call", help="Call a WS RPC method")
+        add_shared(p_call)
+        p_call.add_argument("method", help="RPC method (e.g. status, health.get, config.get)")
+        p_call.add_argument("--params", default="", help="JSON params object (default: {})")
+        p_call.add_argument("--expect-final", action="store_true", help="Wait for final response (when supported)")
+        p_call.set_defaults(func=cmd_call)
+
+    if wanted("discover"):
+        p_discover = sub.add_parser("discover", help="Discover gateways on LAN via mDNS/Bonjour")
+        add_shared(p_discover)
+        p_discover.set_defaults(func=cmd_discover)
+
+    if wanted("probe"):
+        p_probe = sub.add_parser("probe", help="Probe gateways (local, remote, SSH)")
+        add_shared(p_probe)
+        p_probe.set_defaults(func=cmd_probe)
 
     # Service lifecycle (stubs for now; implemented later for full OpenClaw parity).
-    for name in ("run", "install", "start", "stop", "restart", "uninstall"):
+    for name in _LIFECYCLE_SUBCOMMANDS:
+        if not wanted(name):
+            continue
         p = sub.add_parser(name, help=f"{name} (not implemented yet)")
         add_shared(p)
         p.set_defaults(func=cmd_unimplemented)
@@ -439,11 +520,13 @@ def build_parser() -> argparse.ArgumentParser:
 
 
 def main() -> int:
-    parser = build_parser()
-    args = parser.parse_args()
+    argv = sys.argv[1:]
+    # Only the named subcommand is registered; --help and unknown commands get the full parser.
+    parser = build_parser(only=_peek_subcommand(argv))
+    args = parser.parse_args(argv)
 
-    if getattr(args, "no_color", False) or os.getenv("NO_COLOR") or not sys.stdout.isatty():
-        disable_color()
+    global C
+    C = _pick_colors(no_color=bool(getattr(args, "no_color", False)))
 
     if not args.subcommand:
         # OpenClaw-compatible: `openclaw gateway` defaults to `run`.
@@ -455,10 +538,14 @@ def main() -> int:
     except ValueError as exc:
         print(str(exc), file=sys.stderr)
         return 2
-    except WebSocketError as exc:
+    except TimeoutError as exc:
         print(str(exc), file=sys.stderr)
         return 1
-    except TimeoutError as exc:
+    except RuntimeError as exc:
+        # WebSocketError can only be raised once ws_rpc has been imported by a subcommand.
+        ws_rpc = sys.modules.get("ws_rpc")
+        if ws_rpc is None or not isinstance(exc, ws_rpc.WebSocketError):
+            raise
         print(str(exc), file=sys.stderr)
         return 1
 
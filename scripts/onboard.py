@@ -15,16 +15,24 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import hashlib
+import http.client
 import json
 import os
-import secrets
+import re
+import socket
+import stat
 import subprocess
 import sys
+import threading
 import time
-import urllib.error
-import urllib.request
-from getpass import getpass
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable
+
+from compose_ps import stream_compose_ps
 
 if sys.version_info < (3, 10):
     print("ERROR: Python 3.10+ is required.")
@@ -45,92 +53,172 @@ MAG  = "\033[95m"
 CYN  = "\033[96m"
 WHT  = "\033[97m"
 
-def ok(msg: str)   -> None: print(f"  {GRN}✓{R}  {msg}")
-def warn(msg: str) -> None: print(f"  {YLW}!{R}  {msg}")
-def fail(msg: str) -> None: print(f"  {RED}✗{R}  {msg}")
-def info(msg: str) -> None: print(f"  {BLU}→{R}  {msg}")
-def hr(w: int = 58) -> None: print(f"{DIM}{'─' * w}{R}")
+_OK_PREFIX   = f"  {GRN}✓{R}  "
+_WARN_PREFIX = f"  {YLW}!{R}  "
+_FAIL_PREFIX = f"  {RED}✗{R}  "
+_INFO_PREFIX = f"  {BLU}→{R}  "
+_HR          = f"{DIM}{'─' * 58}{R}"
+
+# One pre-joined str per line straight to the text layer (no print() argument handling).
+def ok(msg: str)   -> None: sys.stdout.write(_OK_PREFIX + msg + "\n")
+def warn(msg: str) -> None: sys.stdout.write(_WARN_PREFIX + msg + "\n")
+def fail(msg: str) -> None: sys.stdout.write(_FAIL_PREFIX + msg + "\n")
+def info(msg: str) -> None: sys.stdout.write(_INFO_PREFIX + msg + "\n")
+def hr(w: int = 58) -> None: sys.stdout.write((_HR if w == 58 else f"{DIM}{'─' * w}{R}") + "\n")
 
 def step(n: int, total: int, title: str) -> None:
     print()
     print(f"{BOLD}{CYN}  Step {n}/{total}:{R} {BOLD}{title}{R}")
     hr()
 
+def read_line(prompt: str) -> str:
+    """input() for terminals (keeps readline editing); a plain readline for piped stdin (CI)."""
+    if sys.stdin.isatty():
+        return input(prompt)
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip("\n")
+
 def ask(prompt: str, default: str = "", secret: bool = False) -> str:
     hint = f" {DIM}[{default}]{R}" if default else ""
     full = f"  {WHT}{prompt}{hint}: {R}"
-    val = getpass(full) if secret else input(full)
+    if secret and sys.stdin.isatty():
+        from getpass import getpass
+        sys.stdout.flush()  # getpass prompts on the tty directly
+        val = getpass(full)
+    else:
+        val = read_line(full)
     return val.strip() or default
 
 def confirm(prompt: str, default: bool = True) -> bool:
     hint = "Y/n" if default else "y/N"
-    val = input(f"  {WHT}{prompt}{R} {DIM}[{hint}]{R}: ").strip().lower()
+    val = read_line(f"  {WHT}{prompt}{R} {DIM}[{hint}]{R}: ").strip().lower()
     if not val:
         return default
     return val in ("y", "yes")
 
+_BANNER = "\n".join([
+    "",
+    f"{BOLD}{CYN} ██████╗ ██████╗ ██╗███╗   ███╗███████╗{R}",
+    f"{BOLD}{CYN} ██╔══██╗██╔══██╗██║████╗ ████║██╔════╝{R}",
+    f"{BOLD}{CYN} ██████╔╝██████╔╝██║██╔████╔██║█████╗  {R}",
+    f"{BOLD}{CYN} ██╔═══╝ ██╔══██╗██║██║╚██╔╝██║██╔══╝  {R}",
+    f"{BOLD}{CYN} ██║     ██║  ██║██║██║ ╚═╝ ██║███████╗{R}",
+    f"{BOLD}{CYN} ╚═╝     ╚═╝  ╚═╝╚═╝╚═╝     ╚═╝╚══════╝{R}",
+    "",
+    f" {DIM}Prime — AI Agent Platform  ·  Full Onboarding Automation{R}",
+    "",
+    "",
+])
+
 def banner() -> None:
-    print()
-    print(f"{BOLD}{CYN} ██████╗ ██████╗ ██╗███╗   ███╗███████╗{R}")
-    print(f"{BOLD}{CYN} ██╔══██╗██╔══██╗██║████╗ ████║██╔════╝{R}")
-    print(f"{BOLD}{CYN} ██████╔╝██████╔╝██║██╔████╔██║█████╗  {R}")
-    print(f"{BOLD}{CYN} ██╔═══╝ ██╔══██╗██║██║╚██╔╝██║██╔══╝  {R}")
-    print(f"{BOLD}{CYN} ██║     ██║  ██║██║██║ ╚═╝ ██║███████╗{R}")
-    print(f"{BOLD}{CYN} ╚═╝     ╚═╝  ╚═╝╚═╝╚═╝     ╚═╝╚══════╝{R}")
-    print()
-    print(f" {DIM}Prime — AI Agent Platform  ·  Full Onboarding Automation{R}")
-    print()
+    sys.stdout.write(_BANNER)
 
 # ── .env ─────────────────────────────────────────────────────────────────────
 
-def load_env() -> dict[str, str]:
+@dataclass
+class _EnvState:
+    """Parsed .env: raw lines, values and key → line indexes, valid while `stamp` matches."""
+    stamp: tuple[int, int]          # (mtime_ns, size) when parsed
+    lines: list[str]
+    values: dict[str, str]
+    index: dict[str, list[int]]     # a key may (wrongly) appear on several lines
+
+# Onboarding loads/saves .env several times per run; re-parse only when the file changed on disk.
+_ENV_CACHE: _EnvState | None = None
+
+def _env_stamp() -> tuple[int, int] | None:
+    try:
+        st = ENV_FILE.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _parse_env_lines(lines: list[str]) -> tuple[dict[str, str], dict[str, list[int]]]:
     env: dict[str, str] = {}
-    if ENV_FILE.exists():
-        for line in ENV_FILE.read_text().splitlines():
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                k, _, v = line.partition("=")
-                env[k.strip()] = v.strip()
-    return env
+    index: dict[str, list[int]] = {}
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if line and not line.startswith("#") and "=" in line:
+            k, _, v = line.partition("=")
+            k = k.strip()
+            env[k] = v.strip()
+            index.setdefault(k, []).append(i)
+    return env, index
+
+def _read_env() -> _EnvState | None:
+    global _ENV_CACHE
+    stamp = _env_stamp()
+    if stamp is None:
+        _ENV_CACHE = None
+        return None
+    if _ENV_CACHE is None or _ENV_CACHE.stamp != stamp:
+        lines = ENV_FILE.read_text().splitlines()
+        values, index = _parse_env_lines(lines)
+        _ENV_CACHE = _EnvState(stamp, lines, values, index)
+    return _ENV_CACHE
+
+def load_env() -> dict[str, str]:
+    state = _read_env()
+    return dict(state.values) if state else {}
+
+def _write_env_lines(lines: list[str]) -> None:
+    """Stream lines to a sibling temp file and rename it over .env (crash-safe, no joined copy)."""
+    try:
+        mode = stat.S_IMODE(ENV_FILE.stat().st_mode)
+    except FileNotFoundError:
+        mode = 0o600  # secrets: never create the file world-readable, even briefly
+    tmp = ENV_FILE.with_name(ENV_FILE.name + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with open(fd, "w", buffering=1 << 16) as f:
+        f.writelines(line + "\n" for line in lines)
+    os.chmod(tmp, mode)
+    os.replace(tmp, ENV_FILE)
 
 def save_env(updates: dict[str, str]) -> None:
-    lines: list[str] = []
-    written: set[str] = set()
-    if ENV_FILE.exists():
-        for line in ENV_FILE.read_text().splitlines():
-            stripped = line.strip()
-            if stripped and not stripped.startswith("#") and "=" in stripped:
-                k = stripped.split("=", 1)[0].strip()
-                if k in updates:
-                    lines.append(f"{k}={updates[k]}")
-                    written.add(k)
-                    continue
-            lines.append(line)
+    global _ENV_CACHE
+    state = _read_env() or _EnvState((0, 0), [], {}, {})
+    # Patch the cached lines in place via the key index instead of re-scanning the file.
+    lines = list(state.lines)
+    index = {k: list(v) for k, v in state.index.items()}
     for k, v in updates.items():
-        if k not in written:
-            lines.append(f"{k}={v}")
-    ENV_FILE.write_text("\n".join(lines) + "\n")
+        line = f"{k}={v}"
+        if k in index:
+            for i in index[k]:
+                lines[i] = line
+        else:
+            index[k] = [len(lines)]
+            lines.append(line)
+    if lines == state.lines and _ENV_CACHE is state:
+        return  # every value already matches what's on disk: leave the file (and its mtime) alone
+    _write_env_lines(lines)
+    values = {**state.values, **{k.strip(): str(v).strip() for k, v in updates.items()}}
+    stamp = _env_stamp()
+    _ENV_CACHE = _EnvState(stamp, lines, values, index) if stamp is not None else None
+
+# KEY=value assignments in the template (comment lines can't match: they start with "#").
+_ENV_EXAMPLE_RE = re.compile(r"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t]*$", re.M)
 
 def generate_env_from_example() -> dict[str, str]:
     """Generate .env from .env.example, auto-filling secrets and using env vars."""
     env: dict[str, str] = {}
     if ENV_EXAMPLE.exists():
-        for line in ENV_EXAMPLE.read_text().splitlines():
-            stripped = line.strip()
-            if stripped and not stripped.startswith("#") and "=" in stripped:
-                k, _, v = stripped.partition("=")
-                k = k.strip()
-                env_val = os.getenv(k)
-                if env_val:
-                    env[k] = env_val
-                elif v.strip() and "CHANGE_ME" not in v:
-                    env[k] = v.strip()
-    # Auto-generate secrets
-    for key in ("SECRET_KEY", "JWT_SECRET"):
+        for k, v in _ENV_EXAMPLE_RE.findall(ENV_EXAMPLE.read_text()):
+            env_val = os.getenv(k)
+            if env_val:
+                env[k] = env_val
+            elif v and "CHANGE_ME" not in v:
+                env[k] = v
+    # Auto-generate secrets, all sliced from a single CSPRNG draw (32 + 32 + 16 bytes)
+    raw = os.urandom(80)
+    for key, chunk in (("SECRET_KEY", raw[:32]), ("JWT_SECRET", raw[32:64])):
         if not env.get(key) or "CHANGE_ME" in env.get(key, ""):
-            env[key] = secrets.token_hex(32)
+            env[key] = chunk.hex()
     if not env.get("DB_PASSWORD") or "CHANGE_ME" in env.get("DB_PASSWORD", ""):
-        db_pass = secrets.token_hex(16)
+        db_pass = raw[64:].hex()
         env["DB_PASSWORD"] = db_pass
         env["DATABASE_URL"] = f"postgresql+psycopg://postgres:{db_pass}@db:5432/multibot"
     if not env.get("DATABASE_URL"):
@@ -141,48 +229,154 @@ def generate_env_from_example() -> dict[str, str]:
 
 # ── docker compose ───────────────────────────────────────────────────────────
 
+_PROD_COMPOSE_FILE = ROOT / "docker-compose.prod.yml"
+_COMPOSE_BASE_DEV  = ("docker", "compose", "-f", str(ROOT / "docker-compose.yml"))
+# Without a prod compose file, --prod falls back to the dev stack.
+_COMPOSE_BASE_PROD = (
+    ("docker", "compose", "-f", str(_PROD_COMPOSE_FILE)) if _PROD_COMPOSE_FILE.exists() else _COMPOSE_BASE_DEV
+)
+
 def dc(*args: str, capture: bool = False, check: bool = True, prod: bool = False) -> subprocess.CompletedProcess:
-    cmd = ["docker", "compose"]
-    if prod and (ROOT / "docker-compose.prod.yml").exists():
-        cmd += ["-f", str(ROOT / "docker-compose.prod.yml")]
-    else:
-        cmd += ["-f", str(ROOT / "docker-compose.yml")]
-    cmd += list(args)
+    cmd = [*(_COMPOSE_BASE_PROD if prod else _COMPOSE_BASE_DEV), *args]
+    sys.stdout.flush()  # compose writes straight to our fd: emit buffered lines first
     kwargs: dict = {"cwd": str(ROOT), "check": check}
     if capture:
         kwargs["capture_output"] = True
         kwargs["text"] = True
     return subprocess.run(cmd, **kwargs)
 
-def dc_exec(service: str, *args: str, env_extra: dict | None = None) -> subprocess.CompletedProcess:
-    cmd = ["docker", "compose", "exec"]
-    if env_extra:
-        for k, v in env_extra.items():
-            cmd += ["-e", f"{k}={v}"]
-    cmd += [service] + list(args)
-    return subprocess.run(cmd, cwd=str(ROOT), capture_output=True, text=True)
+def dc_exec(service: str, *args: str, stdin_json: dict | None = None) -> subprocess.CompletedProcess:
+    # Secrets travel as JSON on the child's stdin rather than `-e K=V` flags, which would put
+    # them on the docker CLI argv (visible in `ps` to other users on the host).
+    # Output is always captured, so never ask compose for a pseudo-TTY (-T).
+    cmd = ["docker", "compose", "exec", "-T", service, *args]
+    sys.stdout.flush()  # execs can take seconds: show what we're doing first
+    return subprocess.run(
+        cmd, cwd=str(ROOT), capture_output=True, text=True,
+        input=json.dumps(stdin_json) if stdin_json is not None else None,
+    )
+
+def _run_parallel(*probes: Callable[[], Any]) -> list[Any]:
+    """Run independent zero-arg probes concurrently; results come back in call order."""
+    if not probes:
+        return []
+    sys.stdout.flush()  # probes may block on the network: show the section header first
+    with ThreadPoolExecutor(max_workers=min(len(probes), 16)) as pool:
+        return list(pool.map(lambda fn: fn(), probes))
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+
+# Keep-alive connections per (thread, scheme, host): repeat calls to the same API skip the
+# TCP/TLS handshake, and every HTTPS connection shares one CA-loaded SSL context.
+_HTTP_LOCAL = threading.local()
+_SSL_CONTEXT: Any = None
+
+def _ssl_context() -> Any:
+    global _SSL_CONTEXT
+    if _SSL_CONTEXT is None:
+        import ssl
+        _SSL_CONTEXT = ssl.create_default_context()
+    return _SSL_CONTEXT
+
+def _urlopen_request(method: str, url: str, headers: dict[str, str], body: bytes | None,
+                     timeout: float) -> tuple[int, bytes]:
+    import urllib.error
+    import urllib.request
+
+    req = urllib.request.Request(url, data=body, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+# What a pooled socket the server already closed looks like, before any response byte arrives.
+_STALE_CONN_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+def _http_request(method: str, url: str, *, headers: dict[str, str] | None = None,
+                  body: bytes | None = None, timeout: float = 10,
+                  retry_safe: bool = False) -> tuple[int, bytes]:
+    """Send one request over a pooled keep-alive connection; returns (status, body).
+
+    A stale reused socket is retried once on a fresh one, but only for GET/HEAD or when
+    the caller passes retry_safe=True, so a POST is never sent twice.
+    """
+    import urllib.request
+
+    headers = headers or {}
+    parts = urllib.parse.urlsplit(url)
+    host = parts.hostname or ""
+    if parts.scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(host):
+        return _urlopen_request(method, url, headers, body, timeout)  # let urllib drive the proxy
+
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    pool = getattr(_HTTP_LOCAL, "conns", None)
+    if pool is None:
+        pool = _HTTP_LOCAL.conns = {}
+    key = (parts.scheme, parts.netloc)
+    while True:
+        conn = pool.pop(key, None)
+        reused = conn is not None
+        if conn is None:
+            if parts.scheme == "https":
+                conn = http.client.HTTPSConnection(host, parts.port, timeout=timeout, context=_ssl_context())
+            else:
+                conn = http.client.HTTPConnection(host, parts.port, timeout=timeout)
+        elif conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()
+            if reused and isinstance(exc, _STALE_CONN_ERRORS) and (retry_safe or method in ("GET", "HEAD")):
+                continue  # the server dropped the idle socket: retry once on a fresh one
+            raise
+        try:
+            data = resp.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            pool[key] = conn
+        return resp.status, data
+
+def _backend_json(path: str) -> Any:
+    """GET a local backend endpoint and decode it; HTTP errors raise like urlopen's did."""
+    status, body = _http_request("GET", f"http://localhost:8000{path}", timeout=5)
+    if status >= 400:
+        raise http.client.HTTPException(f"HTTP {status}")
+    return json.loads(body)
 
 # ── Validation ───────────────────────────────────────────────────────────────
 
 def validate_telegram_token(token: str) -> tuple[bool, str]:
     """Call Telegram getMe to validate bot token. Returns (ok, bot_username_or_error)."""
-    url = f"https://api.telegram.org/bot{token}/getMe"
     try:
-        req = urllib.request.Request(url, method="GET")
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-            if data.get("ok"):
-                bot_info = data.get("result", {})
-                username = bot_info.get("username", "unknown")
-                return True, f"@{username}"
-            return False, data.get("description", "unknown error")
-    except urllib.error.HTTPError as exc:
-        if exc.code == 401:
+        status, body = _http_request("GET", f"https://api.telegram.org/bot{token}/getMe")
+        if status == 401:
             return False, "Invalid token (401 Unauthorized)"
-        return False, f"HTTP {exc.code}"
+        if status >= 400:
+            return False, f"HTTP {status}"
+        data = json.loads(body)
+        if data.get("ok"):
+            bot_info = data.get("result", {})
+            username = bot_info.get("username", "unknown")
+            return True, f"@{username}"
+        return False, data.get("description", "unknown error")
     except Exception as exc:
         return False, str(exc)
 
+# Provider replies that settle a key check on their own; 402/429 prove the key authenticated.
+_KEY_STATUS: dict[int, tuple[bool, str]] = {
+    401: (False, "invalid key (401)"),
+    402: (True,  "valid (billing issue)"),
+    403: (False, "forbidden (403)"),
+    429: (True,  "valid (rate limited)"),
+}
+
 def validate_provider_key(provider: str, api_key: str) -> tuple[bool, str]:
     """Quick validation of provider API key. Returns (ok, detail)."""
     if not api_key:
@@ -217,22 +411,16 @@ def validate_provider_key(provider: str, api_key: str) -> tuple[bool, str]:
                 "max_tokens": 1,
                 "messages": [{"role": "user", "content": "hi"}],
             }).encode()
-            req = urllib.request.Request(url, data=data, headers=headers, method="POST")
+            status, _ = _http_request("POST", url, headers=headers, body=data)
         else:
-            req = urllib.request.Request(url, headers=headers, method="GET")
-
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            return True, "valid"
-    except urllib.error.HTTPError as exc:
-        if exc.code == 401:
-            return False, "invalid key (401)"
-        if exc.code == 402:
-            return True, "valid (billing issue)"
-        if exc.code == 429:
-            return True, "valid (rate limited)"
-        return False, f"HTTP {exc.code}"
+            status, _ = _http_request("GET", url, headers=headers)
     except Exception as exc:
         return False, f"unreachable: {exc}"
+    if status in _KEY_STATUS:
+        return _KEY_STATUS[status]
+    if status >= 400:
+        return False, f"HTTP {status}"
+    return True, "valid"
 
 def validate_all_tokens(env: dict[str, str]) -> None:
     """Validate Telegram and provider keys from .env."""
@@ -240,19 +428,7 @@ def validate_all_tokens(env: dict[str, str]) -> None:
     print(f"{BOLD}  Key Validation{R}")
     hr()
 
-    # Telegram
     tokens = [t.strip() for t in env.get("TELEGRAM_BOT_TOKENS", "").split(",") if t.strip()]
-    for token in tokens:
-        valid, detail = validate_telegram_token(token)
-        if valid:
-            ok(f"Telegram bot: {detail}")
-        else:
-            fail(f"Telegram bot: {detail}")
-
-    if not tokens:
-        warn("No Telegram bot tokens configured")
-
-    # Providers
     provider_keys = [
         ("OpenAI",    "OPENAI_API_KEY",       "openai"),
         ("Anthropic", "ANTHROPIC_AUTH_TOKEN",  "anthropic"),
@@ -263,13 +439,30 @@ def validate_all_tokens(env: dict[str, str]) -> None:
         ("GLM/Z.AI",  "ZAI_API_KEY",          "glm"),
         ("Qwen",      "QWEN_API_KEY",         "qwen"),
     ]
+    configured = [(label, provider_id, env[env_key]) for label, env_key, provider_id in provider_keys
+                  if env.get(env_key)]
+
+    # Every check is an independent network round trip: run them all at once,
+    # then report in the usual order.
+    results = _run_parallel(
+        *(lambda t=token: validate_telegram_token(t) for token in tokens),
+        *(lambda p=provider_id, k=key: validate_provider_key(p, k) for _, provider_id, key in configured),
+    )
+    tg_results, provider_results = results[:len(tokens)], results[len(tokens):]
+
+    # Telegram
+    for valid, detail in tg_results:
+        if valid:
+            ok(f"Telegram bot: {detail}")
+        else:
+            fail(f"Telegram bot: {detail}")
 
+    if not tokens:
+        warn("No Telegram bot tokens configured")
+
+    # Providers
     any_valid = False
-    for label, env_key, provider_id in provider_keys:
-        key = env.get(env_key, "")
-        if not key:
-            continue
-        valid, detail = validate_provider_key(provider_id, key)
+    for (label, _, _), (valid, detail) in zip(configured, provider_results):
         if valid:
             ok(f"{label}: {detail}")
             any_valid = True
@@ -281,29 +474,61 @@ def validate_all_tokens(env: dict[str, str]) -> None:
 
 # ── Step implementations ────────────────────────────────────────────────────
 
+# Docker probe results for this run, shared by check_prereqs() and doctor().
+_PROBE_CACHE: dict[str, Any] = {}
+
+def _engine_ping() -> bool | None:
+    """GET /_ping on the Engine socket; None means "ask the CLI"."""
+    path = _docker_socket_path()
+    if path is None:
+        return None
+    conn = _UnixHTTPConnection(path, timeout=3)
+    try:
+        conn.request("GET", "/_ping")
+        return conn.getresponse().status == 200
+    except (OSError, http.client.HTTPException):
+        return None
+    finally:
+        conn.close()
+
+def _docker_info_ok() -> bool:
+    if "docker_ok" not in _PROBE_CACHE:
+        alive = _engine_ping()
+        if alive is None:
+            alive = subprocess.run(["docker", "info"], capture_output=True, text=True).returncode == 0
+        _PROBE_CACHE["docker_ok"] = alive
+    return _PROBE_CACHE["docker_ok"]
+
+def _compose_version() -> str | None:
+    if "compose_version" not in _PROBE_CACHE:
+        r = subprocess.run(["docker", "compose", "version"], capture_output=True, text=True)
+        _PROBE_CACHE["compose_version"] = (
+            r.stdout.strip().split("version")[-1].strip() if r.returncode == 0 else None
+        )
+    return _PROBE_CACHE["compose_version"]
+
 def check_prereqs() -> bool:
     all_ok = True
-    r = subprocess.run(["docker", "info"], capture_output=True, text=True)
-    if r.returncode == 0:
+    docker_ok, compose_ver = _run_parallel(_docker_info_ok, _compose_version)
+    if docker_ok:
         ok("Docker is running")
     else:
         fail("Docker is not running")
         all_ok = False
 
-    r = subprocess.run(["docker", "compose", "version"], capture_output=True, text=True)
-    if r.returncode == 0:
-        ver = r.stdout.strip().split("version")[-1].strip()
-        ok(f"Docker Compose {ver}")
+    if compose_ver is not None:
+        ok(f"Docker Compose {compose_ver}")
     else:
         fail("docker compose not found")
         all_ok = False
     return all_ok
 
 def setup_env(env: dict[str, str]) -> dict[str, str]:
+    raw = os.urandom(64)  # one draw covers both 32-byte secrets
     changed = False
-    for key in ("SECRET_KEY", "JWT_SECRET"):
+    for key, chunk in (("SECRET_KEY", raw[:32]), ("JWT_SECRET", raw[32:])):
         if not env.get(key) or env[key] in ("replace_me", "replace_me_too", "change-me", "change-me-too", ""):
-            env[key] = secrets.token_hex(32)
+            env[key] = chunk.hex()
             ok(f"Generated {key}")
             changed = True
         else:
@@ -319,6 +544,9 @@ def setup_env(env: dict[str, str]) -> dict[str, str]:
         ok("Saved to .env")
     return env
 
+_SET_MARK   = f"{GRN}✓{R}"
+_UNSET_MARK = f"{DIM}○{R}"
+
 def configure_providers(env: dict[str, str]) -> dict[str, str]:
     print(f"\n  {DIM}Configure at least one AI provider to power your agents.{R}")
     print(f"  {DIM}Press Enter to skip a provider.{R}\n")
@@ -336,11 +564,9 @@ def configure_providers(env: dict[str, str]) -> dict[str, str]:
     for env_key, label, hint in providers:
         current = env.get(env_key, "")
         masked = f"{current[:8]}..." if len(current) > 8 else ("(set)" if current else "(not set)")
-        prefix = f"{GRN}✓{R}" if current else f"{DIM}○{R}"
-        val = input(
-            f"  {prefix} {WHT}{label}{R} {DIM}[{masked}]{R}"
-            f"{DIM} (Enter to keep){R}: "
-        ).strip()
+        prefix = _SET_MARK if current else _UNSET_MARK
+        prompt_line = f"  {prefix} {WHT}{label}{R} {DIM}[{masked}] (Enter to keep){R}: "
+        val = read_line(prompt_line).strip()
         if val:
             updates[env_key] = val
             env[env_key] = val
@@ -356,7 +582,7 @@ def configure_telegram(env: dict[str, str]) -> dict[str, str]:
     current = env.get("TELEGRAM_BOT_TOKENS", "")
     masked = f"{current[:12]}..." if len(current) > 12 else ("(set)" if current else "(not set)")
     print(f"\n  {DIM}Get a bot token from @BotFather on Telegram.{R}\n")
-    val = input(
+    val = read_line(
         f"  {WHT}Bot token(s){R} {DIM}[{masked}]{R}"
         f"{DIM} (Enter to keep){R}: "
     ).strip()
@@ -370,33 +596,91 @@ def configure_telegram(env: dict[str, str]) -> dict[str, str]:
         warn("No Telegram bot token set")
     return env
 
+BUILD_HASH_FILE = ROOT / ".onboard_build_hash"
+_BUILD_CONTEXTS = ("backend", "browser")
+_BUILD_SKIP_DIRS = {"__pycache__", ".pytest_cache", ".mypy_cache", ".ruff_cache", "node_modules", "tests"}
+
+def _build_fingerprint(*, prod: bool) -> str:
+    """Digest of the compose files plus (path, size, mtime) of everything in the build contexts."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(b"prod" if prod else b"dev")
+    for compose in sorted(ROOT.glob("docker-compose*.yml")):
+        h.update(compose.name.encode())
+        h.update(compose.read_bytes())
+    for context in _BUILD_CONTEXTS:
+        for dirpath, dirnames, filenames in os.walk(ROOT / context):
+            dirnames[:] = sorted(d for d in dirnames if d not in _BUILD_SKIP_DIRS)
+            for name in sorted(filenames):
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                h.update(f"{os.path.relpath(path, ROOT)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
 def start_services(*, prod: bool = False) -> bool:
-    info("Building and starting services...")
+    # Only ask compose to rebuild when a build input changed since the last successful start;
+    # `--build` otherwise re-plans every image even when all layers are cached.
+    fingerprint = _build_fingerprint(prod=prod)
+    try:
+        previous = BUILD_HASH_FILE.read_text().strip()
+    except OSError:
+        previous = ""
+    args = ["up", "-d"]
+    if fingerprint != previous:
+        args.append("--build")
+        info("Building and starting services...")
+    else:
+        info("Starting services (images up to date)...")
     print()
-    r = dc("up", "-d", "--build", check=False, prod=prod)
+    r = dc(*args, check=False, prod=prod)
     if r.returncode != 0:
         fail("docker compose up failed")
         return False
+    try:
+        BUILD_HASH_FILE.write_text(fingerprint + "\n")
+    except OSError:
+        pass
     ok("Containers started")
     return True
 
 def wait_healthy(timeout: int = 90) -> bool:
-    url = "http://localhost:8000/api/healthz"
-    deadline = time.time() + timeout
+    # Keep one keep-alive connection and back off 50ms → 1s (x1.35 per miss) so a freshly
+    # started backend is detected almost as soon as it answers.
+    deadline_ns = time.monotonic_ns() + timeout * 1_000_000_000
+    delay = 0.05
+    conn: http.client.HTTPConnection | None = None
+    pending_dots = 0
     sys.stdout.write(f"  {BLU}→{R}  Waiting for backend")
     sys.stdout.flush()
-    while time.time() < deadline:
+    while time.monotonic_ns() < deadline_ns:
         try:
-            with urllib.request.urlopen(url, timeout=3) as resp:
-                if resp.status == 200:
-                    print(f" {GRN}ready!{R}")
-                    return True
+            if conn is None:
+                conn = http.client.HTTPConnection("localhost", 8000, timeout=3)
+            conn.request("GET", "/api/healthz")
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status == 200:
+                conn.close()
+                print(f"{'.' * pending_dots} {GRN}ready!{R}")
+                return True
         except Exception:
-            pass
-        sys.stdout.write(".")
-        sys.stdout.flush()
-        time.sleep(2)
-    print(f" {RED}timeout{R}")
+            # Refused/reset/timeout: drop the socket and reconnect on the next attempt.
+            if conn is not None:
+                conn.close()
+            conn = None
+        # Progress dots go out four at a time rather than one write+flush per probe.
+        pending_dots += 1
+        if pending_dots == 4:
+            sys.stdout.write("....")
+            sys.stdout.flush()
+            pending_dots = 0
+        time.sleep(delay)
+        delay = min(delay * 1.35, 1.0)
+    if conn is not None:
+        conn.close()
+    print(f"{'.' * pending_dots} {RED}timeout{R}")
     fail(f"Backend didn't become healthy within {timeout}s")
     return False
 
@@ -412,31 +696,8 @@ def create_admin(env: dict[str, str], password: str | None = None) -> bool:
     else:
         username = "admin"
 
-    script = (
-        "import sys, os; sys.path.insert(0, '/app')\n"
-        "from app.persistence.database import SessionLocal\n"
-        "from app.persistence.models import User, UserRole\n"
-        "import bcrypt\n"
-        "u = os.environ['MB_USER']\n"
-        "p = os.environ['MB_PASS']\n"
-        "with SessionLocal() as db:\n"
-        "    ex = db.query(User).filter(User.username == u).first()\n"
-        "    if ex:\n"
-        "        if not ex.password_hash:\n"
-        "            ex.password_hash = bcrypt.hashpw(p.encode(), bcrypt.gensalt()).decode()\n"
-        "            ex.role = UserRole.admin\n"
-        "            db.commit()\n"
-        "            print('UPDATED')\n"
-        "        else:\n"
-        "            print('EXISTS')\n"
-        "    else:\n"
-        "        h = bcrypt.hashpw(p.encode(), bcrypt.gensalt()).decode()\n"
-        "        db.add(User(username=u, password_hash=h, role=UserRole.admin))\n"
-        "        db.commit()\n"
-        "        print('CREATED')\n"
-    )
-    r = dc_exec("backend", "python", "-c", script,
-                env_extra={"MB_USER": username, "MB_PASS": password})
+    r = dc_exec("backend", "python", "-m", "app.cli.create_admin",
+                stdin_json={"user": username, "pass": password})
     output = (r.stdout + r.stderr).strip()
     if "CREATED" in output or "UPDATED" in output:
         ok(f"Admin user '{username}' ready")
@@ -448,27 +709,60 @@ def create_admin(env: dict[str, str], password: str | None = None) -> bool:
         fail(f"Could not create admin user: {output}")
         return False
 
+def _outcome(fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap a probe for _run_parallel so exceptions come back as values instead of raising."""
+    def run() -> Any:
+        try:
+            return fn()
+        except Exception as exc:
+            return exc
+    return run
+
+def _fetch_backend_summary() -> dict | None:
+    """Health and security audit in one call; None on older backends."""
+    status, body = _http_request("GET", "http://localhost:8000/api/onboard/doctor", timeout=5)
+    if status != 200:
+        return None
+    try:
+        summary = json.loads(body)
+    except ValueError:
+        return None
+    return summary if isinstance(summary, dict) else None
+
+def _count_bindings(bindings: Any) -> int:
+    return len(bindings) if isinstance(bindings, list) else 0
+
+def _count_providers(providers: list[dict]) -> tuple[int, int]:
+    active = [p for p in providers if p.get("active")]
+    with_key = [p for p in active if (p.get("config") or {}).get("api_key")]
+    return len(active), len(with_key)
+
 def verify_e2e(env: dict[str, str]) -> None:
     """Post-setup end-to-end verification."""
     print()
     print(f"{BOLD}  Post-Setup Verification{R}")
     hr()
 
+    # All probes are independent: fire them together, then report in the usual order.
+    tokens = [t.strip() for t in env.get("TELEGRAM_BOT_TOKENS", "").split(",") if t.strip()]
+    health, bindings, providers, *telegram = _run_parallel(
+        _outcome(lambda: _http_request("GET", "http://localhost:8000/api/healthz", timeout=5)[0]),
+        _outcome(lambda: _count_bindings(_backend_json("/api/bindings"))),
+        _outcome(lambda: _count_providers(_backend_json("/api/providers"))),
+        *(lambda t=token: validate_telegram_token(t) for token in tokens),
+    )
+
     # 1. Backend health
-    try:
-        with urllib.request.urlopen("http://localhost:8000/api/healthz", timeout=5) as resp:
-            if resp.status == 200:
-                ok("Backend API healthy")
-            else:
-                fail(f"Backend returned {resp.status}")
-    except Exception as exc:
-        fail(f"Backend unreachable: {exc}")
+    if isinstance(health, Exception):
+        fail(f"Backend unreachable: {health}")
+    elif health == 200:
+        ok("Backend API healthy")
+    else:
+        fail(f"Backend returned {health}")
 
     # 2. Telegram validation
-    tokens = [t.strip() for t in env.get("TELEGRAM_BOT_TOKENS", "").split(",") if t.strip()]
     bot_usernames = []
-    for token in tokens:
-        valid, detail = validate_telegram_token(token)
+    for valid, detail in telegram:
         if valid:
             ok(f"Telegram bot active: {detail}")
             bot_usernames.append(detail)
@@ -476,30 +770,24 @@ def verify_e2e(env: dict[str, str]) -> None:
             fail(f"Telegram bot error: {detail}")
 
     # 3. Check bindings exist (via API)
-    try:
-        with urllib.request.urlopen("http://localhost:8000/api/bindings", timeout=5) as resp:
-            bindings = json.loads(resp.read())
-            if isinstance(bindings, list) and len(bindings) > 0:
-                ok(f"Bindings configured: {len(bindings)}")
-            else:
-                warn("No bindings found — messages won't be routed")
-    except Exception:
+    if isinstance(bindings, Exception):
         warn("Could not check bindings (API may require auth)")
+    elif bindings > 0:
+        ok(f"Bindings configured: {bindings}")
+    else:
+        warn("No bindings found — messages won't be routed")
 
     # 4. Check providers exist
-    try:
-        with urllib.request.urlopen("http://localhost:8000/api/providers", timeout=5) as resp:
-            providers = json.loads(resp.read())
-            active = [p for p in providers if p.get("active")]
-            with_key = [p for p in active if (p.get("config") or {}).get("api_key")]
-            if with_key:
-                ok(f"Active providers with keys: {len(with_key)}")
-            elif active:
-                warn(f"Active providers: {len(active)} (none with API keys)")
-            else:
-                fail("No active providers")
-    except Exception:
+    if isinstance(providers, Exception):
         warn("Could not check providers (API may require auth)")
+    else:
+        active, with_key = providers
+        if with_key:
+            ok(f"Active providers with keys: {with_key}")
+        elif active:
+            warn(f"Active providers: {active} (none with API keys)")
+        else:
+            fail("No active providers")
 
     # Summary
     if bot_usernames:
@@ -508,51 +796,164 @@ def verify_e2e(env: dict[str, str]) -> None:
         for username in bot_usernames:
             print(f"  {CYN}https://t.me/{username.lstrip('@')}{R}")
 
+_SUMMARY = "\n".join([
+    "",
+    f"{BOLD}{GRN}  Setup complete!{R}",
+    "",
+    _HR,
+    f"  {BOLD}Access URLs{R}",
+    f"  {DIM}Admin dashboard{R}  {WHT}http://localhost:5173{R}",
+    f"  {DIM}REST API{R}         {WHT}http://localhost:8000{R}",
+    f"  {DIM}API docs{R}         {WHT}http://localhost:8000/docs{R}",
+    f"  {DIM}Analytics{R}        {WHT}http://localhost:8000/api/analytics/costs/summary{R}",
+    f"  {DIM}Security audit{R}   {WHT}http://localhost:8000/api/analytics/security/audit{R}",
+    _HR,
+    f"  {BOLD}Commands{R}",
+    f"  {CYN}prime status{R}        {DIM}service status{R}",
+    f"  {CYN}prime doctor{R}        {DIM}full health check{R}",
+    f"  {CYN}prime logs{R}          {DIM}follow logs{R}",
+    f"  {CYN}prime gateway url{R}   {DIM}all endpoints{R}",
+    "",
+    "",
+])
+
 def show_summary(env: dict[str, str]) -> None:
-    print()
-    print(f"{BOLD}{GRN}  Setup complete!{R}")
-    print()
-    hr()
-    print(f"  {BOLD}Access URLs{R}")
-    print(f"  {DIM}Admin dashboard{R}  {WHT}http://localhost:5173{R}")
-    print(f"  {DIM}REST API{R}         {WHT}http://localhost:8000{R}")
-    print(f"  {DIM}API docs{R}         {WHT}http://localhost:8000/docs{R}")
-    print(f"  {DIM}Analytics{R}        {WHT}http://localhost:8000/api/analytics/costs/summary{R}")
-    print(f"  {DIM}Security audit{R}   {WHT}http://localhost:8000/api/analytics/security/audit{R}")
-    hr()
-    print(f"  {BOLD}Commands{R}")
-    print(f"  {CYN}prime status{R}        {DIM}service status{R}")
-    print(f"  {CYN}prime doctor{R}        {DIM}full health check{R}")
-    print(f"  {CYN}prime logs{R}          {DIM}follow logs{R}")
-    print(f"  {CYN}prime gateway url{R}   {DIM}all endpoints{R}")
-    print()
+    # Fully static today; `env` stays in the signature for per-run details.
+    sys.stdout.write(_SUMMARY)
 
 # ── Doctor ───────────────────────────────────────────────────────────────────
 
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a unix socket (the Docker Engine API)."""
+
+    def __init__(self, path: str, timeout: float = 5) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._socket_path)
+        self.sock = sock
+
+def _docker_cli_context() -> str:
+    """The docker CLI context in effect ("default" when none is selected)."""
+    context = os.getenv("DOCKER_CONTEXT", "")
+    if context:
+        return context
+    config = Path(os.getenv("DOCKER_CONFIG") or Path.home() / ".docker") / "config.json"
+    try:
+        context = json.loads(config.read_bytes()).get("currentContext") or ""
+    except (OSError, ValueError, AttributeError):
+        context = ""
+    return context or "default"
+
+def _docker_socket_path() -> str | None:
+    # A non-default context (rootless, Desktop, remote) may point at another daemon
+    # than the socket below; only the CLI resolves it the way `docker compose` does.
+    if _docker_cli_context() != "default":
+        return None
+    host = os.getenv("DOCKER_HOST", "")
+    if host and not host.startswith("unix://"):
+        return None  # tcp/ssh contexts: leave it to the CLI
+    path = host[len("unix://"):] if host else "/var/run/docker.sock"
+    return path if os.path.exists(path) else None
+
+def _compose_project_name() -> str:
+    name = os.getenv("COMPOSE_PROJECT_NAME") or load_env().get("COMPOSE_PROJECT_NAME") or ROOT.name
+    # Same normalisation compose applies to the directory name.
+    return "".join(c for c in name.lower() if c.isascii() and (c.isalnum() or c in "-_")).lstrip("-_")
+
+def _engine_compose_ps() -> list[dict] | None:
+    """List this project's containers straight from the Engine API; None means "use the CLI"."""
+    path = _docker_socket_path()
+    if path is None:
+        return None
+    filters = json.dumps({"label": [
+        f"com.docker.compose.project={_compose_project_name()}",
+        "com.docker.compose.oneoff=False",
+    ]})
+    conn = _UnixHTTPConnection(path)
+    try:
+        conn.request("GET", "/containers/json?filters=" + urllib.parse.quote(filters))
+        resp = conn.getresponse()
+        body = resp.read()
+        if resp.status != 200:
+            return None
+        containers = json.loads(body)
+    except (OSError, http.client.HTTPException, json.JSONDecodeError):
+        return None
+    finally:
+        conn.close()
+    services: list[dict] = []
+    for c in containers:
+        labels = c.get("Labels") or {}
+        names = c.get("Names") or []
+        services.append({
+            "Service": labels.get("com.docker.compose.service", ""),
+            "Name": names[0].lstrip("/") if names else "",
+            "State": c.get("State", ""),
+            "Status": c.get("Status", ""),
+        })
+    return services
+
+def _compose_ps() -> list[dict] | None:
+    services = _engine_compose_ps()
+    if services is not None:
+        return services
+    # CLI fallback: the same NDJSON/legacy-array reader `prime gateway status` uses.
+    services, _ = stream_compose_ps(["docker", "compose", "ps", "--format", "json"], cwd=ROOT)
+    return services
+
+def _fetch_healthz() -> tuple[int | None, dict | str]:
+    """One /api/healthz round trip; returns (status, json_payload) or (None, error)."""
+    try:
+        status, body = _http_request("GET", "http://localhost:8000/api/healthz", timeout=5)
+        if status != 200:
+            return status, {}
+        return status, json.loads(body)
+    except Exception as exc:
+        return None, str(exc)
+
+def _fetch_security_audit() -> dict | None:
+    try:
+        audit = _backend_json("/api/analytics/security/audit")
+    except Exception:
+        return None
+    return audit if isinstance(audit, dict) else None
+
+def _fetch_backend_status() -> tuple[tuple[int | None, dict | str], dict | None]:
+    """(healthz result, security audit) for doctor(), in one round trip when the backend allows."""
+    try:
+        summary = _fetch_backend_summary()
+    except Exception as exc:
+        return (None, str(exc)), None
+    if summary is None:
+        health, audit = _run_parallel(_fetch_healthz, _fetch_security_audit)
+        return health, audit
+    audit = summary.get("security_audit")
+    return (200, summary.get("health") or {}), audit if isinstance(audit, dict) else None
+
 def doctor() -> None:
     banner()
     print(f"{BOLD}  System Health Check{R}")
     hr()
     all_ok = True
 
+    # Every probe below is independent: run them concurrently, then report in the usual order
+    docker_ok, services, (health, audit), env_present = _run_parallel(
+        _docker_info_ok, _compose_ps, _fetch_backend_status, ENV_FILE.exists,
+    )
+
     # Docker daemon
-    r = subprocess.run(["docker", "info"], capture_output=True, text=True)
-    if r.returncode == 0:
+    if docker_ok:
         ok("Docker daemon running")
     else:
         fail("Docker daemon not running")
         all_ok = False
 
     # Containers
-    r = subprocess.run(
-        ["docker", "compose", "ps", "--format", "json"],
-        capture_output=True, text=True, cwd=str(ROOT)
-    )
-    if r.returncode == 0:
-        try:
-            services = [json.loads(line) for line in r.stdout.strip().splitlines() if line]
-        except json.JSONDecodeError:
-            services = []
+    if services is not None:
         for svc in services:
             name  = svc.get("Service") or svc.get("Name", "?")
             state = svc.get("State", "?")
@@ -569,25 +970,24 @@ def doctor() -> None:
         warn("Could not list containers")
 
     # Backend API
-    try:
-        with urllib.request.urlopen("http://localhost:8000/api/healthz", timeout=5) as resp:
-            if resp.status == 200:
-                data = json.loads(resp.read())
-                db_ok = data.get("db") or data.get("database") or data.get("status") == "ok"
-                ok("Backend API responding")
-                if db_ok:
-                    ok("Database connected")
-                else:
-                    warn("Database status unknown")
-            else:
-                fail(f"Backend returned {resp.status}")
-                all_ok = False
-    except Exception as exc:
-        fail(f"Backend unreachable: {exc}")
+    status, payload = health
+    if status == 200:
+        data = payload if isinstance(payload, dict) else {}
+        db_ok = data.get("db") or data.get("database") or data.get("status") == "ok"
+        ok("Backend API responding")
+        if db_ok:
+            ok("Database connected")
+        else:
+            warn("Database status unknown")
+    elif status is not None:
+        fail(f"Backend returned {status}")
+        all_ok = False
+    else:
+        fail(f"Backend unreachable: {payload}")
         all_ok = False
 
     # .env
-    if ENV_FILE.exists():
+    if env_present:
         ok(".env present")
     else:
         fail(".env missing — run 'prime onboard'")
@@ -609,21 +1009,17 @@ def doctor() -> None:
             warn(f"{cfg_file} missing")
 
     # Security audit (if backend running)
-    try:
-        with urllib.request.urlopen("http://localhost:8000/api/analytics/security/audit", timeout=5) as resp:
-            audit = json.loads(resp.read())
-            passed = audit.get("passed", 0)
-            failed = audit.get("failed", 0)
-            critical = audit.get("critical", 0)
-            if critical > 0:
-                fail(f"Security audit: {critical} critical, {failed} total issues")
-                all_ok = False
-            elif failed > 0:
-                warn(f"Security audit: {failed} issues (no critical)")
-            else:
-                ok(f"Security audit: {passed} checks passed")
-    except Exception:
-        pass
+    if audit is not None:
+        passed = audit.get("passed", 0)
+        failed = audit.get("failed", 0)
+        critical = audit.get("critical", 0)
+        if critical > 0:
+            fail(f"Security audit: {critical} critical, {failed} total issues")
+            all_ok = False
+        elif failed > 0:
+            warn(f"Security audit: {failed} issues (no critical)")
+        else:
+            ok(f"Security audit: {passed} checks passed")
 
     print()
     if all_ok:
@@ -638,22 +1034,32 @@ def repair() -> None:
     hr()
     ok_steps = 0
 
-    r = dc_exec("backend", "bash", "-lc", "PYTHONPATH=/app alembic -c /app/alembic.ini upgrade head")
-    if r.returncode == 0:
+    # One exec for both steps; each prints a marker on success so results stay per-step.
+    # Config sync still runs when migrations fail, as it did with separate execs.
+    r = dc_exec("backend", "bash", "-lc", " ".join([
+        "PYTHONPATH=/app alembic -c /app/alembic.ini upgrade head && echo __MIGRATE_OK__;",
+        "python -c 'from app.services.config_sync import sync_config_to_db; sync_config_to_db()'",
+        "&& echo __SYNC_OK__",
+    ]))
+    output = "\n".join(
+        line for line in (r.stdout + r.stderr).strip().splitlines()
+        if line not in ("__MIGRATE_OK__", "__SYNC_OK__")
+    )
+    markers = r.stdout.splitlines()
+
+    if "__MIGRATE_OK__" in markers:
         ok("Migrations applied")
         ok_steps += 1
     else:
         fail("Migration failed")
-        print((r.stdout + r.stderr).strip())
+        print(output)
 
-    r = dc_exec("backend", "python", "-c",
-        "from app.services.config_sync import sync_config_to_db; sync_config_to_db(); print('ok')")
-    if r.returncode == 0:
+    if "__SYNC_OK__" in markers:
         ok("Config sync complete")
         ok_steps += 1
     else:
         fail("Config sync failed")
-        print((r.stdout + r.stderr).strip())
+        print(output)
 
     print()
     if ok_steps == 2:
@@ -666,61 +1072,7 @@ def seed() -> None:
     banner()
     print(f"{BOLD}  Seeding data...{R}")
     hr()
-    script = r"""
-import sys, uuid
-sys.path.insert(0, '/app')
-from app.persistence.database import SessionLocal
-from app.persistence.models import Agent, Provider, Binding, ProviderType, DMPolicy, Organization
-
-with SessionLocal() as db:
-    org = db.query(Organization).filter(Organization.slug == 'default').first()
-    if not org:
-        org = Organization(name='Prime', slug='default', active=True)
-        db.add(org)
-        db.commit()
-        db.refresh(org)
-        print('Org created: default')
-    else:
-        print('Org exists: default')
-
-    p = db.query(Provider).filter(Provider.name == 'demo_anthropic').first()
-    if not p:
-        p = Provider(
-            name='demo_anthropic',
-            type=ProviderType.Anthropic,
-            config={'api_key': '', 'default_model': 'claude-sonnet-4-5-20250929',
-                    'models': {'claude-sonnet-4-5-20250929': {'max_tokens': 4096}}},
-            active=True, org_id=org.id,
-        )
-        db.add(p)
-        db.commit()
-        db.refresh(p)
-        print(f'Provider created: {p.name}')
-    else:
-        print(f'Provider exists: {p.name}')
-
-    a = db.query(Agent).filter(Agent.name == 'demo_agent').first()
-    if not a:
-        a = Agent(
-            name='demo_agent',
-            description='Demo agent with web search and memory',
-            default_provider_id=p.id,
-            dm_policy=DMPolicy.open,
-            memory_enabled=True, web_search_enabled=True,
-            code_execution_enabled=True,
-            system_prompt='You are a helpful assistant.',
-            active=True, org_id=org.id,
-        )
-        db.add(a)
-        db.commit()
-        db.refresh(a)
-        print(f'Agent created: {a.name}')
-    else:
-        print(f'Agent exists: {a.name}')
-
-print('Seed complete.')
-"""
-    r = dc_exec("backend", "python", "-c", script)
+    r = dc_exec("backend", "python", "-m", "app.cli.seed_demo")
     for line in (r.stdout + r.stderr).strip().splitlines():
         if line.strip():
             ok(line.strip()) if "created" in line.lower() else info(line.strip())
@@ -872,6 +1224,10 @@ def build_parser() -> argparse.ArgumentParser:
 
 
 def main() -> None:
+    # A terminal stdout is line-buffered (one write per ok()/print()); buffer fully instead
+    # and flush at the points that block: prompts, subprocesses and _run_parallel probes.
+    if sys.stdout.isatty():
+        sys.stdout.reconfigure(line_buffering=False)
     parser = build_parser()
     args = parser.parse_args()
 
@@ -7,7 +7,7 @@ import os
 import stat
 import sys
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 ROOT = Path(__file__).resolve().parents[1]
 BACKEND_PATH = ROOT / "backend"
@@ -16,6 +16,9 @@ if str(BACKEND_PATH) not in sys.path:
 
 from app.services.security_audit import SecurityAuditor  # noqa: E402
 
+# Resolved once: both the audit and --fix act on this directory.
+_CONFIG_DIR = (Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config") / "prime").resolve()
+
 R = "\033[0m"
 GRN = "\033[92m"
 YLW = "\033[93m"
@@ -31,30 +34,25 @@ def _use_color(args: argparse.Namespace) -> bool:
     return sys.stdout.isatty()
 
 
-def _c(value: str, color: str, enabled: bool) -> str:
-    return f"{color}{value}{R}" if enabled else value
-
-
-def _marker(severity: str) -> str:
-    if severity == "critical":
-        return "✗"
-    if severity == "warning":
-        return "!"
-    return "i"
+def _colorizer(enabled: bool) -> Callable[[str, str], str]:
+    # Decided once per run, so the plain-output path is a bare passthrough.
+    if enabled:
+        return lambda value, color: f"{color}{value}{R}"
+    return lambda value, color: value
 
 
-def _severity_color(severity: str) -> str:
-    if severity == "critical":
-        return RED
-    if severity == "warning":
-        return YLW
-    return BLU
+# severity -> (marker, color); anything else renders as info.
+_SEVERITY_STYLE = {
+    "critical": ("✗", RED),
+    "warning": ("!", YLW),
+}
+_INFO_STYLE = ("i", BLU)
 
 
 def _posix_mode(path: Path) -> int | None:
     try:
-        return stat.S_IMODE(path.stat().st_mode)
-    except Exception:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
         return None
 
 
@@ -86,42 +84,40 @@ def _audit_local_files() -> list[dict[str, str]]:
     findings: list[dict[str, str]] = []
 
     env_file = ROOT / ".env"
-    if env_file.exists():
-        mode = _posix_mode(env_file)
-        if mode is not None and (_is_group_readable(mode) or _is_world_readable(mode)):
-            findings.append(
-                {
-                    "severity": "warning",
-                    "code": "ENV_PERMS_OPEN",
-                    "message": f".env is readable by group/others (mode {oct(mode)}).",
-                    "fix": "Run: chmod 600 .env",
-                }
-            )
-
-    config_dir = Path(os.getenv("XDG_CONFIG_HOME", Path.home() / ".config")) / "prime"
+    mode = _posix_mode(env_file)
+    if mode is not None and (_is_group_readable(mode) or _is_world_readable(mode)):
+        findings.append(
+            {
+                "severity": "warning",
+                "code": "ENV_PERMS_OPEN",
+                "message": f".env is readable by group/others (mode {oct(mode)}).",
+                "fix": "Run: chmod 600 .env",
+            }
+        )
+
+    config_dir = _CONFIG_DIR
     auth_file = config_dir / "auth.json"
-    if auth_file.exists():
-        mode = _posix_mode(auth_file)
-        if mode is not None and (_is_group_readable(mode) or _is_world_readable(mode)):
-            findings.append(
-                {
-                    "severity": "warning",
-                    "code": "AUTH_PERMS_OPEN",
-                    "message": f"{auth_file} is readable by group/others (mode {oct(mode)}).",
-                    "fix": f"Run: chmod 600 {auth_file}",
-                }
-            )
-    if config_dir.exists():
-        mode = _posix_mode(config_dir)
-        if mode is not None and (mode & 0o077):
-            findings.append(
-                {
-                    "severity": "info",
-                    "code": "CONFIG_DIR_PERMS_OPEN",
-                    "message": f"{config_dir} is accessible by group/others (mode {oct(mode)}).",
-                    "fix": f"Run: chmod 700 {config_dir}",
-                }
-            )
+    dir_mode = _posix_mode(config_dir)
+    # No config dir (first run) means no auth.json either: skip its stat.
+    mode = _posix_mode(auth_file) if dir_mode is not None else None
+    if mode is not None and (_is_group_readable(mode) or _is_world_readable(mode)):
+        findings.append(
+            {
+                "severity": "warning",
+                "code": "AUTH_PERMS_OPEN",
+                "message": f"{auth_file} is readable by group/others (mode {oct(mode)}).",
+                "fix": f"Run: chmod 600 {auth_file}",
+            }
+        )
+    if dir_mode is not None and (dir_mode & 0o077):
+        findings.append(
+            {
+                "severity": "info",
+                "code": "CONFIG_DIR_PERMS_OPEN",
+                "message": f"{config_dir} is accessible by group/others (mode {oct(dir_mode)}).",
+                "fix": f"Run: chmod 700 {config_dir}",
+            }
+        )
 
     return findings
 
@@ -132,25 +128,32 @@ def _apply_fixes(findings: list[dict[str, str]]) -> list[str]:
 
     if "ENV_PERMS_OPEN" in codes:
         env_file = ROOT / ".env"
-        if env_file.exists() and _chmod_600(env_file):
+        if _chmod_600(env_file):
             actions.append("chmod 600 .env")
 
+    # Never chmod outside the user's home, whatever XDG_CONFIG_HOME points at.
+    if not _CONFIG_DIR.is_relative_to(Path.home().resolve()):
+        if codes & {"AUTH_PERMS_OPEN", "CONFIG_DIR_PERMS_OPEN"}:
+            print(
+                f"warning: {_CONFIG_DIR} is outside $HOME, not touching its permissions",
+                file=sys.stderr,
+            )
+        return actions
+
     if "AUTH_PERMS_OPEN" in codes:
-        config_dir = Path(os.getenv("XDG_CONFIG_HOME", Path.home() / ".config")) / "prime"
-        auth_file = config_dir / "auth.json"
-        if auth_file.exists() and _chmod_600(auth_file):
+        auth_file = _CONFIG_DIR / "auth.json"
+        if _chmod_600(auth_file):
             actions.append(f"chmod 600 {auth_file}")
 
     if "CONFIG_DIR_PERMS_OPEN" in codes:
-        config_dir = Path(os.getenv("XDG_CONFIG_HOME", Path.home() / ".config")) / "prime"
-        if config_dir.exists() and _chmod_700(config_dir):
-            actions.append(f"chmod 700 {config_dir}")
+        if _chmod_700(_CONFIG_DIR):
+            actions.append(f"chmod 700 {_CONFIG_DIR}")
 
     return actions
 
 
 def cmd_audit(args: argparse.Namespace) -> int:
-    color = _use_color(args)
+    c = _colorizer(_use_color(args))
 
     report = SecurityAuditor().run().to_dict()
     file_findings = _audit_local_files() if args.deep else []
@@ -173,7 +176,7 @@ def cmd_audit(args: argparse.Namespace) -> int:
     if args.fix and not args.json:
         actions = _apply_fixes(file_findings)
         if actions:
-            print(_c("Applied fixes:", BLD, color))
+            print(c("Applied fixes:", BLD))
             for a in actions:
                 print(f"- {a}")
             print("")
@@ -188,16 +191,16 @@ def cmd_audit(args: argparse.Namespace) -> int:
         print(json.dumps(payload, ensure_ascii=True, indent=2))
         return 0 if failed == 0 else 1
 
-    print(_c("Prime Security Audit", BLD, color))
-    print(_c("-" * 54, DIM, color))
+    print(c("Prime Security Audit", BLD))
+    print(c("-" * 54, DIM))
     print(f"Passed:   {passed}")
     print(f"Findings: {failed} (critical: {critical})")
     if args.deep:
-        print(_c("Mode:     deep", DIM, color))
+        print(c("Mode:     deep", DIM))
     print("")
 
     if not findings:
-        print(_c("✓ No issues found", GRN, color))
+        print(c("✓ No issues found", GRN))
         return 0
 
     for f in findings:
@@ -205,11 +208,11 @@ def cmd_audit(args: argparse.Namespace) -> int:
         code = str(f.get("code") or "UNKNOWN")
         message = str(f.get("message") or "")
         fix = str(f.get("fix") or "")
-        marker = _marker(severity)
+        marker, sev_color = _SEVERITY_STYLE.get(severity, _INFO_STYLE)
         line = f"{marker} {severity.upper():8} {code}: {message}"
-        print(_c(line, _severity_color(severity), color))
+        print(c(line, sev_color))
         if fix:
-            print(_c(f"    fix: {fix}", DIM, color))
+            print(c(f"    fix: {fix}", DIM))
 
     return 0 if failed == 0 else 1
 
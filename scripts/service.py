@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import os
 import shutil
 import subprocess
@@ -16,16 +17,22 @@ def _run(*args: str, check: bool = True) -> subprocess.CompletedProcess:
     return subprocess.run(list(args), check=check)
 
 
+@functools.lru_cache(maxsize=1)
 def _systemctl_available() -> bool:
     return shutil.which("systemctl") is not None
 
 
+@functools.lru_cache(maxsize=1)
+def _python3() -> str:
+    return shutil.which("python3") or "python3"
+
+
 def _service_path() -> Path:
     return SYSTEMD_USER_DIR / f"{SERVICE_NAME}.service"
 
 
 def _render_service() -> str:
-    python = shutil.which("python3") or "python3"
+    python = _python3()
     env_file = ROOT / ".env"
     return f"""[Unit]
 Description=Prime Gateway (non-Docker)
@@ -60,10 +67,15 @@ def cmd_install(_: argparse.Namespace) -> int:
 
 def cmd_uninstall(_: argparse.Namespace) -> int:
     path = _service_path()
-    if path.exists():
-        path.unlink()
-        print(f"Removed {path}")
-    if _systemctl_available():
+    if not path.exists():
+        return 0  # nothing installed: no unit to stop, nothing for systemd to reload
+    systemctl = _systemctl_available()
+    if systemctl:
+        # One spawn stops and disables the unit while its file still exists.
+        _run("systemctl", "--user", "disable", "--now", SERVICE_NAME, check=False)
+    path.unlink()
+    print(f"Removed {path}")
+    if systemctl:
         _run("systemctl", "--user", "daemon-reload")
     return 0
 
@@ -3,24 +3,53 @@ from __future__ import annotations
 
 import base64
 import hashlib
+import hmac
 import json
 import os
+import selectors
 import socket
 import ssl
-import struct
 import time
-import uuid
 from dataclasses import dataclass
 from typing import Any
 from urllib.parse import urlparse, urlunparse
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
 _WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_WS_GUID_BYTES = _WS_GUID.encode("ascii")
+
+
+if orjson is not None:
+    _encode_json = orjson.dumps  # compact UTF-8 bytes
+    _decode_json = orjson.loads
+else:
+    # Built once: json.dumps/json.loads with non-default arguments construct a new coder per call.
+    _JSON_ENCODER = json.JSONEncoder(ensure_ascii=True, separators=(",", ":"))
+    _decode_json = json.JSONDecoder().decode
+
+    def _encode_json(obj: Any) -> bytes:
+        return _JSON_ENCODER.encode(obj).encode("ascii")
 
 
 class WebSocketError(RuntimeError):
     pass
 
 
+_TLS_CONTEXT: ssl.SSLContext | None = None
+
+
+def _tls_context() -> ssl.SSLContext:
+    # Loading the system trust store is the slowest part of a wss:// connect; do it once.
+    global _TLS_CONTEXT
+    if _TLS_CONTEXT is None:
+        _TLS_CONTEXT = ssl.create_default_context()
+    return _TLS_CONTEXT
+
+
 def normalize_ws_url(raw: str, *, default_path: str = "/api/ws/events") -> str:
     """
     Accept ws(s)://, http(s)://, or host:port and normalize to a concrete WS URL.
@@ -51,8 +80,16 @@ def normalize_ws_url(raw: str, *, default_path: str = "/api/ws/events") -> str:
     return urlunparse(normalized)
 
 
-def _sha1_base64(data: bytes) -> str:
-    return base64.b64encode(hashlib.sha1(data).digest()).decode("ascii")
+def _accept_key(key: bytes) -> bytes:
+    """Sec-WebSocket-Accept expected for a client key (RFC 6455 section 4.2.2)."""
+    h = hashlib.sha1(key)
+    h.update(_WS_GUID_BYTES)
+    return base64.b64encode(h.digest())
+
+
+def _req_id() -> str:
+    # Same 32-char lowercase hex shape as uuid4().hex, without building a UUID object.
+    return os.urandom(16).hex()
 
 
 def _rand_key() -> str:
@@ -60,13 +97,16 @@ def _rand_key() -> str:
 
 
 def _mask(payload: bytes, mask_key: bytes) -> bytes:
-    out = bytearray(len(payload))
-    for i, b in enumerate(payload):
-        out[i] = b ^ mask_key[i % 4]
-    return bytes(out)
+    # XOR the whole payload against the repeated key as two big ints: one C-level pass
+    # instead of a Python loop per byte.
+    n = len(payload)
+    if not n:
+        return b""
+    tiled = (mask_key * ((n + 3) // 4))[:n]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(tiled, "big")).to_bytes(n, "big")
 
 
-def _encode_client_frame(opcode: int, payload: bytes) -> bytes:
+def _encode_client_frame(opcode: int, payload: bytes) -> bytearray:
     # Client-to-server frames MUST be masked.
     fin_opcode = 0x80 | (opcode & 0x0F)
     length = len(payload)
@@ -77,14 +117,15 @@ def _encode_client_frame(opcode: int, payload: bytes) -> bytes:
         header.append(mask_bit | length)
     elif length <= 0xFFFF:
         header.append(mask_bit | 126)
-        header += struct.pack("!H", length)
+        header += length.to_bytes(2, "big")
     else:
         header.append(mask_bit | 127)
-        header += struct.pack("!Q", length)
+        header += length.to_bytes(8, "big")
 
     mask_key = os.urandom(4)
     header += mask_key
-    return bytes(header) + _mask(payload, mask_key)
+    header += _mask(payload, mask_key)  # one growing buffer for the whole frame
+    return header
 
 
 @dataclass
@@ -95,6 +136,20 @@ class _SocketReader:
     def recv_exact(self, n: int) -> bytes:
         if n <= 0:
             return b""
+        have = len(self.buf)
+        if n - have >= 4096:
+            # Large payload: let the kernel fill the destination directly instead of growing
+            # and then shifting self.buf.
+            out = bytearray(n)
+            out[:have] = self.buf
+            self.buf.clear()
+            view = memoryview(out)
+            while have < n:
+                got = self.sock.recv_into(view[have:])
+                if not got:
+                    raise WebSocketError("connection closed")
+                have += got
+            return bytes(out)
         while len(self.buf) < n:
             chunk = self.sock.recv(max(4096, n - len(self.buf)))
             if not chunk:
@@ -105,14 +160,16 @@ class _SocketReader:
         return out
 
     def recv_until(self, needle: bytes, limit: int = 65536) -> tuple[bytes, bytes]:
-        while needle not in self.buf:
+        # Only search bytes that could complete a match, so a slow trickle stays O(n).
+        start = 0
+        while (idx := self.buf.find(needle, start)) == -1:
+            start = max(0, len(self.buf) - len(needle) + 1)
             chunk = self.sock.recv(4096)
             if not chunk:
                 raise WebSocketError("connection closed during handshake")
             self.buf += chunk
             if len(self.buf) > limit:
                 raise WebSocketError("handshake response too large")
-        idx = self.buf.index(needle)
         head = bytes(self.buf[:idx])
         rest = bytes(self.buf[idx + len(needle):])
         self.buf = bytearray(rest)
@@ -123,6 +180,15 @@ class WebSocket:
     def __init__(self, sock: socket.socket, *, reader: _SocketReader) -> None:
         self.sock = sock
         self._r = reader
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(sock, selectors.EVENT_READ)
+
+    def wait_readable(self, timeout: float) -> bool:
+        """Block until a frame can start arriving, up to `timeout` seconds."""
+        # Bytes already pulled off the socket (or decrypted by TLS) never wake the selector.
+        if self._r.buf or (isinstance(self.sock, ssl.SSLSocket) and self.sock.pending()):
+            return True
+        return bool(self._sel.select(timeout))
 
     @classmethod
     def connect(cls, url: str, *, timeout_s: float = 10.0, user_agent: str = "prime-cli") -> "WebSocket":
@@ -141,43 +207,44 @@ class WebSocket:
             path = path + "?" + parsed.query
 
         sock = socket.create_connection((host, port), timeout=timeout_s)
+        # Small request/response frames: don't let Nagle hold them back waiting for an ACK.
+        # Keepalive lets a long-lived client notice a peer that vanished behind a NAT.
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
         if scheme == "wss":
-            context = ssl.create_default_context()
-            sock = context.wrap_socket(sock, server_hostname=host)
+            sock = _tls_context().wrap_socket(sock, server_hostname=host)
 
         sock.settimeout(timeout_s)
         reader = _SocketReader(sock=sock, buf=bytearray())
 
         key = _rand_key()
-        req_lines = [
-            f"GET {path} HTTP/1.1",
-            f"Host: {host}:{port}",
-            "Upgrade: websocket",
-            "Connection: Upgrade",
-            f"Sec-WebSocket-Key: {key}",
-            "Sec-WebSocket-Version: 13",
-            f"User-Agent: {user_agent}",
-        ]
-        req = ("\r\n".join(req_lines) + "\r\n\r\n").encode("utf-8")
+        req = b"\r\n".join([
+            b"GET " + path.encode("utf-8") + b" HTTP/1.1",
+            f"Host: {host}:{port}".encode("utf-8"),
+            b"Upgrade: websocket",
+            b"Connection: Upgrade",
+            b"Sec-WebSocket-Key: " + key.encode("ascii"),
+            b"Sec-WebSocket-Version: 13",
+            b"User-Agent: " + user_agent.encode("utf-8"),
+            b"",
+            b"",  # the two empty entries produce the closing blank line
+        ])
         sock.sendall(req)
 
         raw_head, _ = reader.recv_until(b"\r\n\r\n")
-        head = raw_head.decode("iso-8859-1", errors="replace")
-        lines = head.split("\r\n")
+        lines = raw_head.split(b"\r\n")
         status = lines[0].strip()
-        if not status.startswith("HTTP/1.1 101"):
-            raise WebSocketError(f"handshake failed: {status}")
+        if not status.startswith(b"HTTP/1.1 101"):
+            raise WebSocketError(f"handshake failed: {status.decode('iso-8859-1')}")
 
-        headers: dict[str, str] = {}
+        headers: dict[bytes, bytes] = {}
         for line in lines[1:]:
-            if ":" not in line:
-                continue
-            k, v = line.split(":", 1)
-            headers[k.strip().lower()] = v.strip()
+            k, sep, v = line.partition(b":")
+            if sep:
+                headers[k.strip().lower()] = v.strip()
 
-        accept = headers.get("sec-websocket-accept", "")
-        expected = _sha1_base64((key + _WS_GUID).encode("utf-8"))
-        if accept.lower() != expected.lower():
+        accept = headers.get(b"sec-websocket-accept", b"")
+        if not hmac.compare_digest(accept, _accept_key(key.encode("ascii"))):
             raise WebSocketError("handshake failed: invalid Sec-WebSocket-Accept")
 
         return cls(sock, reader=reader)
@@ -187,6 +254,7 @@ class WebSocket:
             self.sock.sendall(_encode_client_frame(0x8, b""))
         except Exception:
             pass
+        self._sel.close()
         try:
             self.sock.close()
         except Exception:
@@ -196,7 +264,7 @@ class WebSocket:
         self.sock.sendall(_encode_client_frame(0x1, text.encode("utf-8")))
 
     def send_json(self, payload: dict[str, Any]) -> None:
-        self.send_text(json.dumps(payload, ensure_ascii=True, separators=(",", ":")))
+        self.sock.sendall(_encode_client_frame(0x1, _encode_json(payload)))
 
     def _recv_frame(self) -> tuple[int, bytes]:
         b1, b2 = self._r.recv_exact(2)
@@ -205,15 +273,15 @@ class WebSocket:
         masked = (b2 & 0x80) != 0
         length = b2 & 0x7F
         if length == 126:
-            (length,) = struct.unpack("!H", self._r.recv_exact(2))
+            length = int.from_bytes(self._r.recv_exact(2), "big")
         elif length == 127:
-            (length,) = struct.unpack("!Q", self._r.recv_exact(8))
+            length = int.from_bytes(self._r.recv_exact(8), "big")
 
         mask_key = b""
         if masked:
             mask_key = self._r.recv_exact(4)
 
-        payload = self._r.recv_exact(int(length))
+        payload = self._r.recv_exact(length)
         if masked:
             payload = _mask(payload, mask_key)
 
@@ -239,7 +307,7 @@ class WebSocket:
 
             try:
                 text = payload.decode("utf-8", errors="replace")
-                parsed = json.loads(text) if text.strip() else {}
+                parsed = _decode_json(text) if text.strip() else {}
             except Exception as exc:
                 raise WebSocketError(f"invalid JSON frame: {exc}") from exc
 
@@ -276,6 +344,7 @@ class WSRPCClient:
         self.client_version = client_version
         self.platform = platform
         self._ws: WebSocket | None = None
+        self._last_timeout = -1.0
 
     def _deadline(self) -> float:
         return time.monotonic() + (self.timeout_ms / 1000.0)
@@ -285,9 +354,14 @@ class WSRPCClient:
             raise WebSocketError("not connected")
         while True:
             remaining = deadline - time.monotonic()
-            if remaining <= 0:
+            if remaining <= 0 or not self._ws.wait_readable(remaining):
                 raise TimeoutError("websocket operation timed out")
-            self._ws.sock.settimeout(max(0.25, remaining))
+            # The socket timeout now only bounds reads inside a frame that has started arriving.
+            target = max(0.25, remaining)
+            # Skip the settimeout syscall while events stream in and the value barely moves.
+            if abs(target - self._last_timeout) > 0.05:
+                self._ws.sock.settimeout(target)
+                self._last_timeout = target
             try:
                 return self._ws.recv_json()
             except socket.timeout as exc:
@@ -302,6 +376,7 @@ class WSRPCClient:
         deadline = self._deadline()
         ws = WebSocket.connect(self.url, timeout_s=self.timeout_ms / 1000.0)
         self._ws = ws
+        self._last_timeout = -1.0
 
         challenge = self._recv_with_deadline(deadline=deadline)
         if not (challenge.get("type") == "event" and challenge.get("event") == "connect.challenge"):
@@ -311,7 +386,7 @@ class WSRPCClient:
         if not nonce:
             raise WebSocketError("connect.challenge missing nonce")
 
-        req_id = uuid.uuid4().hex
+        req_id = _req_id()
         params: dict[str, Any] = {
             "nonce": nonce,
             "client": {
@@ -351,7 +426,7 @@ class WSRPCClient:
         if self._ws is None:
             raise WebSocketError("not connected")
         deadline = self._deadline()
-        req_id = uuid.uuid4().hex
+        req_id = _req_id()
         payload: dict[str, Any] = {"type": "req", "id": req_id, "method": method, "params": params or {}}
         if idempotency_key:
             payload["idempotency_key"] = idempotency_key
@@ -378,4 +453,5 @@ class WSRPCClient:
             return
         self._ws.close()
         self._ws = None
+        self._last_timeout = -1.0
 
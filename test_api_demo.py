@@ -6,7 +6,19 @@
 
 import sys
 import os
-from pathlib import Path
+import re
+import importlib
+import importlib.util
+
+from check_helpers import count_files, run_captured
+
+def _require_module(module):
+    """Проверка наличия модуля без выполнения его кода"""
+    if importlib.util.find_spec(module) is None:
+        raise ImportError(f"No module named '{module}'")
+
+# Каталог бэкенда рядом со скриптом, независимо от текущей директории
+_BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
 
 def test_imports():
     """Проверка импортов основных модулей"""
@@ -21,7 +33,7 @@ def test_imports():
     
     for name, module in modules_to_test:
         try:
-            __import__(module)
+            _require_module(module)
             print(f"  ✓ {name}")
         except ImportError as e:
             print(f"  ✗ {name}: {e}")
@@ -33,8 +45,9 @@ def test_backend_modules():
     """Проверка импортов модулей бэкенда"""
     print("\nПроверка импортов модулей бэкенда...")
     
-    # Добавляем путь к бэкенду
-    sys.path.insert(0, os.path.join(os.getcwd(), "backend"))
+    # Добавляем путь к бэкенду (один раз за процесс)
+    if _BACKEND_DIR not in sys.path:
+        sys.path.insert(0, _BACKEND_DIR)
     
     backend_modules = [
         ("Настройки", "app.config.settings"),
@@ -46,7 +59,7 @@ def test_backend_modules():
     
     for name, module_path in backend_modules:
         try:
-            __import__(module_path)
+            importlib.import_module(module_path)
             print(f"  ✓ {name}")
         except ImportError as e:
             print(f"  ✗ {name}: {e}")
@@ -54,11 +67,31 @@ def test_backend_modules():
     
     return True
 
+def _count_top_level(yaml, stream, loader):
+    """Число элементов верхнего уровня YAML по потоку событий, без построения объектов"""
+    depth = count = 0
+    root_is_mapping = False
+    for event in yaml.parse(stream, Loader=loader):
+        if isinstance(event, yaml.CollectionEndEvent):
+            depth -= 1
+        elif isinstance(event, yaml.NodeEvent):
+            if depth == 0:
+                root_is_mapping = isinstance(event, yaml.MappingStartEvent)
+            elif depth == 1:
+                count += 1
+            if isinstance(event, yaml.CollectionStartEvent):
+                depth += 1
+    # У отображения на первом уровне чередуются ключи и значения
+    return count // 2 if root_is_mapping else count
+
 def test_config_parsing():
     """Проверка парсинга конфигурационных файлов"""
     print("\nПроверка парсинга конфигурационных файлов...")
     
     import yaml
+
+    # libyaml-парсер, если PyYAML собран с ним; иначе чистый Python
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     
     config_files = [
         ("config/providers.yaml", "Провайдеры"),
@@ -68,10 +101,10 @@ def test_config_parsing():
     
     for file_path, name in config_files:
         try:
-            with open(file_path, 'r') as f:
-                config = yaml.safe_load(f)
-            if config:
-                print(f"  ✓ {name}: {len(config)} элементов")
+            with open(file_path, 'rb') as f:
+                count = _count_top_level(yaml, f, loader)
+            if count:
+                print(f"  ✓ {name}: {count} элементов")
             else:
                 print(f"  ✗ {name}: пустой файл")
         except Exception as e:
@@ -79,30 +112,35 @@ def test_config_parsing():
     
     return True
 
+# Важные переменные .env.example и шаблон их объявлений (закомментированные не считаются)
+_IMPORTANT_VARS = (
+    "DATABASE_URL",
+    "SECRET_KEY",
+    "OPENAI_API_KEY",
+    "GEMINI_API_KEY",
+    "ANTHROPIC_API_KEY",
+)
+_IMPORTANT_VARS_RE = re.compile(
+    r"^[ \t]*(" + "|".join(map(re.escape, _IMPORTANT_VARS)) + r")[ \t]*=", re.M
+)
+
 def test_env_file():
     """Проверка .env файла"""
     print("\nПроверка .env файла...")
     
     env_example = ".env.example"
     if os.path.exists(env_example):
-        with open(env_example, 'r') as f:
-            lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        with open(env_example, 'r', encoding='utf-8', errors='replace') as f:
+            data = f.read()
+        lines = [line for line in map(str.strip, data.splitlines()) if line and not line.startswith('#')]
         
         print(f"  ✓ .env.example: {len(lines)} переменных окружения")
         
-        # Проверяем важные переменные
-        important_vars = [
-            "DATABASE_URL",
-            "SECRET_KEY", 
-            "OPENAI_API_KEY",
-            "GEMINI_API_KEY",
-            "ANTHROPIC_API_KEY"
-        ]
-        
-        env_content = "\n".join(lines)
+        # Проверяем важные переменные: один проход регуляркой по всему файлу
+        defined = set(_IMPORTANT_VARS_RE.findall(data))
         missing = []
-        for var in important_vars:
-            if var in env_content:
+        for var in _IMPORTANT_VARS:
+            if var in defined:
                 print(f"    • {var}: присутствует")
             else:
                 print(f"    • {var}: отсутствует")
@@ -127,24 +165,24 @@ def test_project_structure():
         "prime/": "CLI инструменты",
     }
     
+    # Один listdir корня вместо stat на каждый ожидаемый каталог
+    with os.scandir(".") as it:
+        present = {e.name + "/": e.path for e in it if e.is_dir()}
+    
     for path, name in structure.items():
-        if os.path.exists(path):
+        entry_path = present.get(path)
+        if entry_path:
             # Подсчитываем файлы
-            py_files = len(list(Path(path).rglob("*.py")))
-            total_files = len(list(Path(path).rglob("*")))
+            total_files, py_files = count_files(entry_path)
             print(f"  ✓ {name}: {total_files} файлов ({py_files} .py)")
         else:
             print(f"  ✗ {name}: не найден")
     
     return True
 
-def generate_quickstart_guide():
-    """Генерация краткого руководства по запуску"""
-    print("\n" + "="*60)
-    print("КРАТКОЕ РУКОВОДСТВО ПО ЗАПУСКУ")
-    print("="*60)
-    
-    guide = """
+# Текст руководства собирается один раз при импорте
+_QUICKSTART_HEADER = "\n" + "="*60 + "\nКРАТКОЕ РУКОВОДСТВО ПО ЗАПУСКУ\n" + "="*60 + "\n"
+_QUICKSTART_GUIDE = """
 1. НАСТРОЙКА ОКРУЖЕНИЯ:
    ```
    cp .env.example .env
@@ -198,9 +236,13 @@ def generate_quickstart_guide():
    - Провайдеры: config/providers.yaml
    - Боты: config/bots.yaml
    - Плагины: config/plugins.yaml
-   """
-    
-    print(guide)
+   
+"""
+
+def generate_quickstart_guide():
+    """Генерация краткого руководства по запуску"""
+    sys.stdout.write(_QUICKSTART_HEADER)
+    sys.stdout.write(_QUICKSTART_GUIDE)
 
 def main():
     """Основная функция"""
@@ -219,13 +261,9 @@ def main():
     results = []
     
     for test_name, test_func in tests:
-        print(f"\n{test_name}:")
-        try:
-            success = test_func()
-            results.append((test_name, success))
-        except Exception as e:
-            print(f"  ✗ Ошибка: {e}")
-            results.append((test_name, False))
+        success, output = run_captured(test_name, test_func)
+        sys.stdout.write(output)
+        results.append((test_name, success))
     
     # Итоги
     print("\n" + "="*60)
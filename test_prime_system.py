@@ -6,7 +6,54 @@
 import sys
 import os
 import json
-from pathlib import Path
+
+from check_helpers import count_files, iter_files, run_captured
+
+# Расширение -> счетчик в статистике проекта
+_STAT_KINDS = {
+    ".py": "py",
+    ".js": "js_ts",
+    ".ts": "js_ts",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+}
+
+# Служебные каталоги и артефакты сборки, в которые не спускаемся при подсчете
+_SKIP_DIRS = {
+    ".git",
+    "node_modules",
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    "dist",
+    "build",
+    ".next",
+}
+
+def _project_stats(root):
+    """Статистика проекта за один обход: счетчики по типам и общий размер"""
+    stats = {"py": 0, "js_ts": 0, "yaml": 0, "size": 0}
+    for entry in iter_files(root, _SKIP_DIRS):
+        kind = _STAT_KINDS.get(os.path.splitext(entry.name)[1])
+        if kind:
+            stats[kind] += 1
+        try:
+            stats["size"] += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass
+    return stats
+
+def _check_file(path, name=None):
+    """Один stat на файл: печатает размер или отсутствие, возвращает найден ли"""
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        print(f"  ✗ {name or path}: не найден")
+        return False
+    print(f"  ✓ {name or path}: {size} байт")
+    return True
 
 def test_config_files():
     """Проверка конфигурационных файлов"""
@@ -20,11 +67,7 @@ def test_config_files():
     }
     
     for name, path in configs.items():
-        if os.path.exists(path):
-            size = os.path.getsize(path)
-            print(f"  ✓ {name}: {size} байт")
-        else:
-            print(f"  ✗ {name}: не найден")
+        if not _check_file(path, name):
             return False
     
     return True
@@ -43,7 +86,7 @@ def test_backend_structure():
     
     for dir_path in required_dirs:
         if os.path.exists(dir_path):
-            files = len(list(Path(dir_path).rglob("*.py")))
+            _, files = count_files(dir_path)
             print(f"  ✓ {dir_path}: {files} Python файлов")
         else:
             print(f"  ✗ {dir_path}: не найден")
@@ -63,11 +106,7 @@ def test_frontend_structure():
     ]
     
     for file_path in required_files:
-        if os.path.exists(file_path):
-            size = os.path.getsize(file_path)
-            print(f"  ✓ {file_path}: {size} байт")
-        else:
-            print(f"  ✗ {file_path}: не найден")
+        if not _check_file(file_path):
             return False
     
     return True
@@ -84,11 +123,7 @@ def test_docker_config():
     ]
     
     for file_path in docker_files:
-        if os.path.exists(file_path):
-            size = os.path.getsize(file_path)
-            print(f"  ✓ {file_path}: {size} байт")
-        else:
-            print(f"  ✗ {file_path}: не найден")
+        if not _check_file(file_path):
             return False
     
     return True
@@ -104,15 +139,11 @@ def test_cli_tools():
     ]
     
     for file_path in cli_files:
-        if os.path.exists(file_path):
-            size = os.path.getsize(file_path)
-            print(f"  ✓ {file_path}: {size} байт")
-        else:
-            print(f"  ✗ {file_path}: не найден")
+        _check_file(file_path)
     
     # Проверка директории prime
     if os.path.exists("prime"):
-        py_files = len(list(Path("prime").rglob("*.py")))
+        _, py_files = count_files("prime")
         print(f"  ✓ prime/: {py_files} Python файлов")
     else:
         print(f"  ✗ prime/: не найден")
@@ -132,11 +163,7 @@ def test_documentation():
     ]
     
     for doc in docs:
-        if os.path.exists(doc):
-            size = os.path.getsize(doc)
-            print(f"  ✓ {doc}: {size} байт")
-        else:
-            print(f"  ✗ {doc}: не найден")
+        _check_file(doc)
     
     return True
 
@@ -158,13 +185,9 @@ def main():
     results = []
     
     for test_name, test_func in tests:
-        print(f"\n{test_name}:")
-        try:
-            success = test_func()
-            results.append((test_name, success))
-        except Exception as e:
-            print(f"  ✗ Ошибка: {e}")
-            results.append((test_name, False))
+        success, output = run_captured(test_name, test_func)
+        sys.stdout.write(output)
+        results.append((test_name, success))
     
     # Итоги
     print("\n" + "="*60)
@@ -188,19 +211,14 @@ def main():
     print("АНАЛИЗ СИСТЕМЫ")
     print("="*60)
     
-    # Подсчет файлов
-    total_py_files = len(list(Path(".").rglob("*.py")))
-    total_js_ts_files = len(list(Path(".").rglob("*.js"))) + len(list(Path(".").rglob("*.ts")))
-    total_yaml_files = len(list(Path(".").rglob("*.yaml"))) + len(list(Path(".").rglob("*.yml")))
+    # Подсчет файлов и размера проекта
+    stats = _project_stats(".")
     
     print(f"\nСтатистика проекта:")
-    print(f"  • Python файлов: {total_py_files}")
-    print(f"  • JavaScript/TypeScript файлов: {total_js_ts_files}")
-    print(f"  • YAML файлов: {total_yaml_files}")
-    
-    # Проверка размера проекта
-    total_size = sum(f.stat().st_size for f in Path(".").rglob("*") if f.is_file())
-    print(f"  • Общий размер: {total_size / 1024 / 1024:.1f} MB")
+    print(f"  • Python файлов: {stats['py']}")
+    print(f"  • JavaScript/TypeScript файлов: {stats['js_ts']}")
+    print(f"  • YAML файлов: {stats['yaml']}")
+    print(f"  • Общий размер: {stats['size'] / 1024 / 1024:.1f} MB")
     
     # Рекомендации
     print("\n" + "="*60)